@@ -107,6 +107,14 @@ class AICacheManager:
             }
             self.access_times[cache_key] = time.time()
     
+    def invalidate(self, messages: List['ChatMessage'], model_id: str, parameters: Dict = None):
+        """删除单条缓存的响应"""
+        cache_key = self._generate_cache_key(messages, model_id, parameters)
+        
+        with self.lock:
+            self.cache.pop(cache_key, None)
+            self.access_times.pop(cache_key, None)
+    
     def clear_cache(self):
         """清除所有缓存"""
         with self.lock:
@@ -314,6 +322,11 @@ class BaseAIAdapter:
         if self.cache_manager:
             self.cache_manager.cache_response(messages, model_id, response, parameters)
     
+    def invalidate_cached_response(self, messages: List[ChatMessage], model_id: str, parameters: Dict = None):
+        """删除某次请求缓存的响应，使相同请求重新调用AI（如结果未通过调用方的校验）"""
+        if self.cache_manager:
+            self.cache_manager.invalidate(messages, model_id, parameters)
+    
     def _update_performance_stats(self, start_time: float, tokens: int = 0, cache_hit: bool = False):
         """更新性能统计"""
         latency = time.time() - start_time
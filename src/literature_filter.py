@@ -665,13 +665,13 @@ class LiteratureFilter:
         
         with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
             # 提交所有批次任务
-            future_to_batch = {
-                executor.submit(self._process_batch, batch, criteria): batch 
+            futures = [
+                executor.submit(self._process_batch, batch, criteria)
                 for batch in batches
-            }
+            ]
             
             # 收集结果
-            for future in as_completed(future_to_batch):
+            for future in as_completed(futures):
                 try:
                     batch_results = future.result()
                     filtered_articles.extend(batch_results)
@@ -7,24 +7,56 @@
 支持Pandoc导出DOCX格式
 """
 
+import io
 import json
 import os
 import re
 import subprocess
 import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import yaml
 import sys
 import os
+# 项目根目录（模块加载时计算一次）
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_RAW_DOCS_DIR = os.path.join(_PROJECT_ROOT, "output", "综述AI返回原始数据（用于核对）")
+# 本进程中已确认存在的目录
+_ENSURED_DIRS = set()
+
 # 添加项目根目录到Python路径
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(_PROJECT_ROOT)
 
 from ai_client import AIClient, ConfigManager, ChatMessage
 from prompts_manager import PromptsManager
 
 
+# 文件名清理用的预编译正则
+_TITLE_BAD_CHARS = re.compile(r'[^\w\u4e00-\u9fff\s-]')
+_TITLE_WHITESPACE = re.compile(r'\s+')
+
+# 第一个标题行（允许行首任意空白，含全角空格，与str.strip()一致）
+_FIRST_HEADING = re.compile(r'^\s*#', re.MULTILINE)
+
+# 统计字数时删除的空白字符（含中文全角空格）
+_WORD_COUNT_DELETE = str.maketrans('', '', ' \n\r\t\u3000')
+
+
+def _ensure_dir(path: str):
+    """确保目录存在，每个目录在进程内只检查/创建一次"""
+    if path in _ENSURED_DIRS:
+        return
+    os.makedirs(path, exist_ok=True)
+    _ENSURED_DIRS.add(path)
+
+
+def _sanitize_title(text: str, limit: int = 30) -> str:
+    """清理标题用于文件名：移除特殊字符、限制长度、空格替换为下划线"""
+    return _TITLE_WHITESPACE.sub('_', _TITLE_BAD_CHARS.sub('', text).strip()[:limit])
+
+
 @dataclass
 class ReviewSection:
     """综述章节数据类"""
@@ -181,7 +213,7 @@ class PandocExporter:
         import platform
         
         # 1. 优先查找项目便携版
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        project_root = _PROJECT_ROOT
         system = platform.system().lower()
         
         # 便携版路径映射
@@ -290,6 +322,7 @@ class MedicalReviewGenerator:
         self.config_name = config_name
         self.output_dir = output_dir or os.path.join("output", "综述文章")
         self.model_id = None
+        self._last_saved_size = 0
         self.model_parameters = {
             "temperature": 0.3,  # 较低的温度保证专业性和一致性
             "stream": True,      # 启用流式输出进行测试
@@ -301,6 +334,8 @@ class MedicalReviewGenerator:
         
         # 初始化Pandoc导出器
         self.pandoc_exporter = PandocExporter()
+        # 后台DOCX转换线程池，首次调用export_docx_async时创建，由close()关闭
+        self._docx_executor = None
         
         # 输出目录将在实际保存文件时创建
         # os.makedirs(self.output_dir, exist_ok=True)  # 移除提前创建
@@ -713,7 +748,8 @@ class MedicalReviewGenerator:
             article_content = self._add_complete_references(article_content, literature)
             
             # 然后重新排序引用标记和参考文献
-            article_content = self._reorder_citations_and_references(article_content, literature)
+            article_content = self._reorder_citations_and_references(article_content, literature,
+                                                                     has_references=True)
             
             print("完整医学综述文章生成完成!")
             
@@ -779,7 +815,8 @@ class MedicalReviewGenerator:
         print(f"已添加完整参考文献列表 ({len(literature)} 篇文献)")
         return article_content
 
-    def _reorder_citations_and_references(self, article_content: str, literature: List[Literature]) -> str:
+    def _reorder_citations_and_references(self, article_content: str, literature: List[Literature],
+                                          has_references: Optional[bool] = None) -> str:
         """
         重新排序引用标记和参考文献
         按文章中引用出现的顺序重新编号，只保留被引用的文献
@@ -788,6 +825,7 @@ class MedicalReviewGenerator:
         Args:
             article_content: 原始文章内容
             literature: 文献列表
+            has_references: 文章末尾是否已有参考文献部分（None表示未知，需要检测）
             
         Returns:
             str: 重新编号后的文章内容
@@ -891,8 +929,13 @@ class MedicalReviewGenerator:
         new_references = self.generate_references(cited_literature)
         
         # 6. 替换或添加参考文献部分
+        # 调用方已知文章结构时直接定位末尾的参考文献标题，省去整篇文章的正则扫描
+        ref_start = updated_content.rfind("\n## 参考文献\n") if has_references else -1
         reference_section_pattern = r'##\s*参考文献\s*\n.*$'
-        if re.search(reference_section_pattern, updated_content, re.MULTILINE | re.DOTALL):
+        if ref_start >= 0:
+            updated_content = f"{updated_content[:ref_start + 1]}## 参考文献\n\n{new_references}"
+            print("替换了现有的参考文献部分")
+        elif has_references is not False and re.search(reference_section_pattern, updated_content, re.MULTILINE | re.DOTALL):
             # 替换现有的参考文献部分
             updated_content = re.sub(
                 reference_section_pattern, 
@@ -920,14 +963,25 @@ class MedicalReviewGenerator:
         Returns:
             str: 格式化的参考文献
         """
-        references = []
+        # 直接写入缓冲区，不保留每条引用的中间字符串
+        buf = io.StringIO()
+        write = buf.write
         for i, lit in enumerate(literature, 1):
-            ref = f"{i}. {lit.get_ama_citation()}"
+            # 参考文献会在添加完整列表和重新编号时多次生成，缓存AMA引用避免重复格式化
+            ama = getattr(lit, '_cached_ama', None)
+            if ama is None:
+                ama = lit.get_ama_citation()
+                lit._cached_ama = ama
+            if i > 1:
+                write('\n')
+            write(str(i))
+            write('. ')
+            write(ama)
             if lit.url:
-                ref += f" Available from: {lit.url}"
-            references.append(ref)
+                write(' Available from: ')
+                write(lit.url)
         
-        return '\n'.join(references)
+        return buf.getvalue()
     
     def _save_raw_output(self, raw_content: str, title: str):
         """
@@ -938,39 +992,37 @@ class MedicalReviewGenerator:
             title: 文章标题
         """
         try:
-            # 获取项目根目录
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            raw_docs_dir = os.path.join(project_root, "output", "综述AI返回原始数据（用于核对）")
+            raw_docs_dir = _RAW_DOCS_DIR
             
             # 确保原始文档目录存在
-            os.makedirs(raw_docs_dir, exist_ok=True)
+            _ensure_dir(raw_docs_dir)
             
-            # 生成文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # 生成文件名（文件名与文档头部共用同一时间）
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             # 清理标题，移除特殊字符
-            clean_title = re.sub(r'[^\w\u4e00-\u9fff\s-]', '', title)
-            clean_title = clean_title.strip()[:30]  # 限制长度
-            clean_title = re.sub(r'\s+', '_', clean_title)  # 替换空格为下划线
+            clean_title = _sanitize_title(title)
             
             filename = f"原始输出-{clean_title}-{timestamp}.md"
             filepath = os.path.join(raw_docs_dir, filename)
             
-            # 构建完整的原始文档内容
-            raw_document = f"""# AI原始输出文档
+            # 构建文档头部（正文单独编码写入，不再拼接完整文档字符串）
+            header = f"""# AI原始输出文档
 
-**生成时间**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}  
+**生成时间**: {now.strftime("%Y-%m-%d %H:%M:%S")}  
 **文章标题**: {title}  
 **模型**: {self.model_id}  
 **输出长度**: {len(raw_content)} 字符
 
 ---
 
-{raw_content}
-"""
+""".encode('utf-8')
             
             # 保存原始输出
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(raw_document)
+            with open(filepath, 'wb', buffering=1 << 16) as f:
+                f.write(header)
+                f.write(raw_content.encode('utf-8'))
+                f.write(b"\n")
             
             print(f"原始AI输出已保存: {filepath}")
             
@@ -982,19 +1034,12 @@ class MedicalReviewGenerator:
         if not content:
             return content
         
-        lines = content.split('\n')
-        
-        # 查找第一个以#开头的标题行
-        title_start_index = -1
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
-            if line_stripped.startswith('#'):
-                title_start_index = i
-                break
-        
+        # 查找第一个以#开头的标题行（由正则引擎直接定位，避免按行拆分整篇文章）
+        match = _FIRST_HEADING.search(content)
+
         # 如果找到标题，从标题开始保留所有内容
-        if title_start_index >= 0:
-            cleaned_content = '\n'.join(lines[title_start_index:]).strip()
+        if match:
+            cleaned_content = content[match.end() - 1:].strip()
             if cleaned_content and len(cleaned_content) > 50:
                 return cleaned_content
         
@@ -1002,6 +1047,40 @@ class MedicalReviewGenerator:
         print("警告: 未找到标题行或内容过短，返回原始内容")
         return content
     
+    def _export_docx(self, filepath: str) -> Optional[str]:
+        """导出DOCX，失败时只记录错误并返回None"""
+        try:
+            docx_path = self.pandoc_exporter.convert_to_docx(
+                filepath, 
+                style="academic"
+            )
+            print(f"DOCX版本已导出: {docx_path}")
+            return docx_path
+        except Exception as docx_error:
+            print(f"DOCX导出失败: {docx_error}")
+            # 即使DOCX导出失败，MD文件仍然成功保存
+            return None
+    
+    def export_docx_async(self, filepath: str) -> Future:
+        """
+        在后台线程中将Markdown文件导出为DOCX，批量生成时可与后续文章的生成重叠
+        
+        Args:
+            filepath: Markdown文件路径
+            
+        Returns:
+            Future: 调用.result()获取DOCX路径，导出失败时结果为None
+        """
+        if self._docx_executor is None:
+            self._docx_executor = ThreadPoolExecutor(max_workers=2)
+        return self._docx_executor.submit(self._export_docx, filepath)
+    
+    def close(self):
+        """等待后台DOCX导出完成并关闭线程池"""
+        if self._docx_executor is not None:
+            self._docx_executor.shutdown(wait=True)
+            self._docx_executor = None
+    
     def save_article(self, content: str, filename: str = None, user_input: str = None, 
                      export_docx: bool = False) -> tuple:
         """
@@ -1011,7 +1090,7 @@ class MedicalReviewGenerator:
             content: 文章内容
             filename: 文件名（可选）
             user_input: 用户输入内容（可选）
-            export_docx: 是否同时导出DOCX格式
+            export_docx: 是否同时导出DOCX格式（需后台导出时传False，再调用export_docx_async）
             
         Returns:
             tuple: (md_file_path, docx_file_path) 如果不导出docx，第二个值为None
@@ -1020,10 +1099,7 @@ class MedicalReviewGenerator:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             if user_input:
                 # 清理用户输入，移除特殊字符，限制长度
-                clean_input = re.sub(r'[^\w\u4e00-\u9fff\s-]', '', user_input)
-                clean_input = clean_input.strip()[:30]  # 限制为30个字符
-                # 替换空格为下划线，确保文件名格式统一
-                clean_input = re.sub(r'\s+', '_', clean_input)
+                clean_input = _sanitize_title(user_input)
                 filename = f"综述-{clean_input}-{timestamp}.md"
             else:
                 filename = f"综述-{timestamp}.md"
@@ -1032,26 +1108,20 @@ class MedicalReviewGenerator:
         
         try:
             # 确保输出目录存在（在实际保存时创建）
-            os.makedirs(self.output_dir, exist_ok=True)
+            _ensure_dir(self.output_dir)
             
             # 1. 保存Markdown文件
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
+                # 写入完成后的文件位置即字节数，避免为统计大小再编码一遍全文
+                self._last_saved_size = f.tell()
             
             print(f"文章已保存到: {filepath}")
             
             # 2. 可选导出DOCX格式
             docx_path = None
             if export_docx and self.pandoc_exporter.is_available():
-                try:
-                    docx_path = self.pandoc_exporter.convert_to_docx(
-                        filepath, 
-                        style="academic"
-                    )
-                    print(f"DOCX版本已导出: {docx_path}")
-                except Exception as docx_error:
-                    print(f"DOCX导出失败: {docx_error}")
-                    # 即使DOCX导出失败，MD文件仍然成功保存
+                docx_path = self._export_docx(filepath)
             elif export_docx and not self.pandoc_exporter.is_available():
                 print("Pandoc不可用，跳过DOCX导出")
             
@@ -1089,10 +1159,11 @@ class MedicalReviewGenerator:
         md_path, docx_path = self.save_article(article_content, output_filename, user_input, export_docx)
         
         # 显示统计信息
-        word_count = len(article_content.replace(' ', '').replace('\n', ''))
+        word_count = len(article_content.translate(_WORD_COUNT_DELETE))
         print(f"\n文章统计:")
         print(f"   总字数: {word_count:,}")
-        print(f"   文件大小: {len(article_content.encode('utf-8')):,} 字节")
+        if md_path:
+            print(f"   文件大小: {self._last_saved_size:,} 字节")
         
         return md_path, docx_path
 
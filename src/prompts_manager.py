@@ -5,11 +5,56 @@
 负责加载、管理和应用AI提示词配置
 """
 
-import yaml
 import os
-from typing import Dict, Any, Optional
+import copy
+import functools
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
+# 进程内配置解析缓存: 绝对路径 -> (修改时间, 解析结果)
+_CONFIG_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_loader():
+    """延迟导入yaml，优先使用libyaml的C加载器，不可用时回退到纯Python实现"""
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:
+        from yaml import SafeLoader as loader
+    return loader
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_dumper():
+    """延迟导入yaml，优先使用libyaml的C输出器，不可用时回退到纯Python实现"""
+    try:
+        from yaml import CSafeDumper as dumper
+    except ImportError:
+        from yaml import SafeDumper as dumper
+    return dumper
+
+
+@functools.lru_cache(maxsize=2)
+def _build_date_info(current_year: int, current_month: int, current_day: int) -> str:
+    """构建意图分析用的日期说明块，同一天内内容不变"""
+    return f"""
+当前日期: {current_year}年{current_month:02d}月{current_day:02d}日 (第{current_year}年)
+**重要：基于当前日期({current_year}年{current_month}月)精确计算年份限制**
+  - "近年来"或"最近"：{current_year-2}-{current_year}年
+  - "近3年"：{current_year-2}-{current_year}年
+  - "近5年"：{current_year-4}-{current_year}年
+  - "近10年"：{current_year-9}-{current_year}年
+  - "最近几年"：{current_year-3}-{current_year}年
+  - "过去5年"：{current_year-4}-{current_year}年
+  - "2020年以来"：2020-{current_year}年
+  - "疫情期间"或"COVID期间"：2020-{current_year}年
+
+示例 - 用户输入"近5年高影响因子研究"：
+基于当前日期({current_year}年)，"近5年"应解析为{current_year-4}-{current_year}年
+"""
+
+
 class PromptsManager:
     """提示词配置管理器"""
     
@@ -22,6 +67,8 @@ class PromptsManager:
         """
         self.config_path = config_path
         self.config = {}
+        self._flat = {}
+        self._dirty = False
         self.load_config()
     
     def load_config(self) -> bool:
@@ -37,8 +84,20 @@ class PromptsManager:
                 self._create_default_config()
                 return False
                 
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+            # 文件未修改时直接复用已解析的配置，避免重复解析YAML
+            cache_key = os.path.abspath(self.config_path)
+            mtime = os.path.getmtime(self.config_path)
+            cached = _CONFIG_CACHE.get(cache_key)
+            if cached and cached[0] == mtime:
+                self.config = copy.deepcopy(cached[1])
+            else:
+                import yaml
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    config = yaml.load(f, Loader=_yaml_loader())
+                _CONFIG_CACHE[cache_key] = (mtime, config)
+                # 调用方可能修改配置，返回副本以保持缓存不被污染
+                self.config = copy.deepcopy(config)
+            self._build_flat_index()
             
             print("成功加载提示词配置:", self.config_path)
             return True
@@ -47,6 +106,23 @@ class PromptsManager:
             print("加载提示词配置失败:", e)
             return False
     
+    def _build_flat_index(self):
+        """预先展开配置为 {"a.b.c": value} 形式，供get_config_value单次查找"""
+        flat = {}
+        stack = [("", self.config)]
+        while stack:
+            prefix, node = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            for key, value in node.items():
+                # 含点号或非字符串的键无法通过点分路径访问，与逐级查找保持一致
+                if not isinstance(key, str) or '.' in key:
+                    continue
+                path = f"{prefix}.{key}" if prefix else key
+                flat[path] = value
+                stack.append((path, value))
+        self._flat = flat
+    
     def _create_default_config(self):
         """创建默认配置文件"""
         print("创建默认提示词配置文件...")
@@ -61,8 +137,9 @@ class PromptsManager:
         }
         
         try:
+            import yaml
             with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(default_config, f, ensure_ascii=False, indent=2)
+                yaml.dump(default_config, f, Dumper=_yaml_dumper(), indent=2, allow_unicode=True)
             print("默认配置已创建:", self.config_path)
         except Exception as e:
             print(f"创建默认配置失败: {e}")
@@ -94,37 +171,20 @@ class PromptsManager:
         Returns:
             str: 格式化的提示词
         """
-        from datetime import datetime
         current_date = datetime.now()
-        current_year = current_date.year
-        current_month = current_date.month
         
         template = self.get_prompt("intent_analysis", "user_prompt_template")
         
-        # 添加当前日期信息到提示词
-        date_info = f"""
-当前日期: {current_date.strftime('%Y年%m月%d日')} (第{current_year}年)
-**重要：基于当前日期({current_year}年{current_month}月)精确计算年份限制**
-  - "近年来"或"最近"：{current_year-2}-{current_year}年
-  - "近3年"：{current_year-2}-{current_year}年
-  - "近5年"：{current_year-4}-{current_year}年
-  - "近10年"：{current_year-9}-{current_year}年
-  - "最近几年"：{current_year-3}-{current_year}年
-  - "过去5年"：{current_year-4}-{current_year}年
-  - "2020年以来"：2020-{current_year}年
-  - "疫情期间"或"COVID期间"：2020-{current_year}年
-
-示例 - 用户输入"近5年高影响因子研究"：
-基于当前日期({current_year}年)，"近5年"应解析为{current_year-4}-{current_year}年
-"""
+        # 添加当前日期信息到提示词（按天缓存）
+        date_info = _build_date_info(current_date.year, current_date.month, current_date.day)
         
         # 格式化提示词
         formatted_prompt = template.format(user_input=user_input)
         
         # 在用户输入之前插入日期信息
-        if "用户输入:" in formatted_prompt:
-            prompt_parts = formatted_prompt.split("用户输入:", 1)
-            final_prompt = prompt_parts[0] + date_info + "用户输入:" + prompt_parts[1]
+        head, sep, tail = formatted_prompt.partition("用户输入:")
+        if sep:
+            final_prompt = "".join((head, date_info, sep, tail))
         else:
             final_prompt = date_info + formatted_prompt
             
@@ -174,14 +234,7 @@ class PromptsManager:
         Returns:
             Any: 配置值
         """
-        try:
-            keys = key_path.split('.')
-            value = self.config
-            for key in keys:
-                value = value[key]
-            return value
-        except (KeyError, TypeError):
-            return default_value
+        return self._flat.get(key_path, default_value)
     
     def update_config(self, updates: Dict[str, Any]) -> bool:
         """
@@ -194,15 +247,17 @@ class PromptsManager:
             bool: 更新成功返回True
         """
         try:
-            # 递归更新配置
-            def deep_update(base_dict, update_dict):
+            # 深度合并配置（显式栈迭代，避免逐层递归调用）
+            stack = [(self.config, updates)]
+            while stack:
+                base_dict, update_dict = stack.pop()
                 for key, value in update_dict.items():
-                    if isinstance(value, dict) and key in base_dict:
-                        deep_update(base_dict[key], value)
+                    if isinstance(value, dict) and isinstance(base_dict.get(key), dict):
+                        stack.append((base_dict[key], value))
                     else:
                         base_dict[key] = value
-            
-            deep_update(self.config, updates)
+            self._build_flat_index()
+            self._dirty = True
             
             # 保存到文件
             return self.save_config()
@@ -211,21 +266,31 @@ class PromptsManager:
             print(f"更新配置失败: {e}")
             return False
     
-    def save_config(self) -> bool:
+    def save_config(self, force: bool = False) -> bool:
         """
         保存配置到文件
         
+        Args:
+            force: 即使配置未通过update_config修改也强制写入
+            
         Returns:
             bool: 保存成功返回True
         """
+        # 配置未修改时无需重写文件
+        if not self._dirty and not force:
+            return True
+        
         try:
             # 更新最后修改时间
             self.config['last_updated'] = datetime.now().strftime('%Y-%m-%d')
+            self._flat['last_updated'] = self.config['last_updated']
             
+            import yaml
             with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, ensure_ascii=False, indent=2, 
+                yaml.dump(self.config, f, Dumper=_yaml_dumper(), indent=2, 
                          default_flow_style=False, allow_unicode=True)
             
+            self._dirty = False
             print(f"配置已保存: {self.config_path}")
             return True
             
@@ -7,21 +7,72 @@ PubMed文献搜索和导出工具 v2.0
 
 import requests
 import json
-import csv
+import io
 import asyncio
 import aiohttp
 import lxml.etree as lxml_etree
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Tuple
 import time
-import argparse
 import sys
 import os
 import hashlib
+import sqlite3
 import threading
+import logging
 from urllib.parse import quote
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from operator import itemgetter
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录，缓存目录固定在其下，不随当前工作目录变化
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SEARCH_CACHE_DIR = os.path.join(_PROJECT_ROOT, "pubmed_cache")
+_ARTICLE_CACHE_DIR = os.path.join(_PROJECT_ROOT, "pubmed_article_cache")
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_loads(data):
+    """解析JSON（bytes或str），优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """序列化为UTF-8编码的JSON字节串，优先使用orjson"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+async def _run_in_thread(func, *args):
+    """在默认线程池中执行阻塞函数（asyncio.to_thread需要Python 3.9，这里用run_in_executor实现）"""
+    return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args))
+
+
+def _parse_esearch_response(content: bytes) -> Tuple[List[str], int]:
+    """
+    解析esearch的JSON响应
+    
+    Args:
+        content: 响应内容
+    
+    Returns:
+        (PMID列表, 总结果数)
+    """
+    # orjson在C层直接构建PMID列表，比正则提取后逐个切分更快，因此不做正则特化
+    result = _json_loads(content).get('esearchresult', {})
+    return result.get('idlist', []), int(result.get('count', 0))
 
 
 @dataclass
@@ -37,35 +88,161 @@ class SearchConfig:
     enable_cache: bool = True
     cache_ttl: int = 3600
     cache_max_size: int = 1000
+    article_cache_ttl: int = 86400 * 7  # 文章详情很少变化，按PMID缓存一周
+    article_cache_max_size: int = 50000
     enable_async: bool = True
     max_concurrent: int = 5
+    api_key: str = ""  # NCBI API key，设置后限速从3次/秒提高到10次/秒
+
+
+class _RateLimiter:
+    """令牌桶限速器，线程与协程共用，保证对NCBI的总请求速率不超过限制"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.refill_rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数（令牌不足时透支，按补充速率排队）"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+            self._updated = now
+            self.tokens -= 1
+            return -self.tokens / self.refill_rate if self.tokens < 0 else 0.0
+    
+    def acquire(self):
+        """同步获取令牌"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    async def acquire_async(self):
+        """异步获取令牌，等待期间不阻塞事件循环"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+def _copy_article(article: Dict) -> Dict:
+    """复制文章字典；字段值只有字符串和字符串列表，复制其中的列表即可与原字典完全独立"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in article.items()}
 
 
 class SearchResultCache:
-    """搜索结果缓存管理器"""
+    """搜索结果缓存管理器（文件存储 + SQLite LRU索引）"""
     
-    def __init__(self, cache_dir: str = "pubmed_cache", max_size: int = 1000, ttl: int = 3600):
+    def __init__(self, cache_dir: str = _SEARCH_CACHE_DIR, max_size: int = 1000, ttl: int = 3600,
+                 mem_max_size: Optional[int] = None):
         self.cache_dir = cache_dir
         self.max_size = max_size
+        # 内存层容量，默认与磁盘容量一致；条目较大时可单独调小
+        self.mem_max_size = mem_max_size or max_size
         self.ttl = ttl
         self.lock = threading.Lock()
         self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        # 命中计数在内存层锁下、未命中与淘汰计数在文件锁下产生，统一由该锁保护
+        self._stats_lock = threading.Lock()
+        
+        # 内存层：缓存键 -> (过期时间, 缓存内容)，热点读取不触及文件系统
+        self._mem = OrderedDict()
+        self._mem_lock = threading.RLock()
+        # 内存命中的访问时间，延迟到下次写入时批量同步到LRU索引
+        self._pending_atime = {}
         
         # 创建缓存目录
         os.makedirs(cache_dir, exist_ok=True)
+        
+        # LRU索引：记录每个缓存键的最近访问时间，淘汰时无需遍历目录
+        self.db = sqlite3.connect(
+            os.path.join(cache_dir, 'lru.db'),
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, atime REAL, size INTEGER)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS idx_atime ON cache(atime)')
+        self._index_existing_files()
+        # 索引条目数，打开时统计一次，之后随插入与删除增减，写入时无需COUNT(*)
+        self._count = self.db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+    
+    def _index_existing_files(self):
+        """索引为空时导入目录中已有的缓存文件（兼容旧版本缓存）"""
+        if self.db.execute('SELECT 1 FROM cache LIMIT 1').fetchone():
+            return
+        
+        rows = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    rows.append((entry.name[:-5], stat.st_mtime, stat.st_size))
+        if rows:
+            self.db.executemany('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)', rows)
     
     def _generate_cache_key(self, query: str, max_results: int, sort_by: str) -> str:
-        """生成缓存键"""
+        """生成缓存键（非加密用途，blake2b比MD5更快，且在FIPS模式下可用）"""
         content = f"{query}:{max_results}:{sort_by}"
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
     
     def _get_cache_file_path(self, cache_key: str) -> str:
         """获取缓存文件路径"""
         return os.path.join(self.cache_dir, f"{cache_key}.json")
     
+    def _count_stat(self, key: str, amount=1):
+        """线程安全地累加一项缓存计数"""
+        with self._stats_lock:
+            self.stats[key] += amount
+    
+    def _remember(self, cache_key: str, expires_at: float, value: Any):
+        """写入内存层，超出容量时淘汰最久未使用的条目"""
+        with self._mem_lock:
+            self._mem[cache_key] = (expires_at, value)
+            self._mem.move_to_end(cache_key)
+            while len(self._mem) > self.mem_max_size:
+                self._mem.popitem(last=False)
+    
+    def _remove_entry(self, cache_key: str):
+        """删除缓存文件及其索引记录"""
+        with self._mem_lock:
+            self._mem.pop(cache_key, None)
+            self._pending_atime.pop(cache_key, None)
+        cache_file = self._get_cache_file_path(cache_key)
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        self._count -= self.db.execute('DELETE FROM cache WHERE key = ?', (cache_key,)).rowcount
+    
     def get(self, query: str, max_results: int, sort_by: str) -> Optional[List[str]]:
         """获取缓存的PMID列表"""
         cache_key = self._generate_cache_key(query, max_results, sort_by)
+        pmids = self._get_entry(cache_key, 'pmids', [])
+        # 返回副本，调用方修改结果不会影响内存层中的缓存内容
+        return list(pmids) if pmids is not None else None
+    
+    def get_pmid(self, pmid: str) -> Optional[Dict]:
+        """获取按PMID缓存的文章信息（返回副本，调用方可自由修改）"""
+        article = self._get_entry(pmid, 'article')
+        return _copy_article(article) if article else None
+    
+    def _get_entry(self, cache_key: str, field: str, default: Any = None) -> Any:
+        """按缓存键读取缓存内容中的指定字段，未命中或已过期时返回None"""
+        # 先查内存层
+        with self._mem_lock:
+            entry = self._mem.get(cache_key)
+            if entry is not None:
+                now = time.time()
+                if now < entry[0]:
+                    self._mem.move_to_end(cache_key)
+                    self._pending_atime[cache_key] = now
+                    self._count_stat('hits')
+                    return entry[1]
+                del self._mem[cache_key]
+        
         cache_file = self._get_cache_file_path(cache_key)
         
         with self.lock:
@@ -73,48 +250,117 @@ class SearchResultCache:
                 try:
                     file_stat = os.stat(cache_file)
                     if time.time() - file_stat.st_mtime < self.ttl:
-                        with open(cache_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            self.stats['hits'] += 1
-                            return data.get('pmids', [])
+                        with open(cache_file, 'rb') as f:
+                            data = _json_loads(f.read())
+                            self._count_stat('hits')
+                            value = data.get(field, default)
+                            self._remember(cache_key, file_stat.st_mtime + self.ttl, value)
+                            # 命中时刷新访问时间（真正的LRU）
+                            self.db.execute(
+                                'UPDATE cache SET atime = ? WHERE key = ?',
+                                (time.time(), cache_key)
+                            )
+                            return value
                     else:
                         # 清除过期缓存
-                        os.remove(cache_file)
-                        self.stats['evictions'] += 1
+                        self._remove_entry(cache_key)
+                        self._count_stat('evictions')
                 except Exception:
                     # 缓存文件损坏，删除
-                    if os.path.exists(cache_file):
-                        os.remove(cache_file)
+                    self._remove_entry(cache_key)
         
-        self.stats['misses'] += 1
+        self._count_stat('misses')
         return None
     
     def put(self, query: str, max_results: int, sort_by: str, pmids: List[str]):
         """缓存PMID列表"""
         cache_key = self._generate_cache_key(query, max_results, sort_by)
-        cache_file = self._get_cache_file_path(cache_key)
-        
+        cache_data = {
+            'query': query,
+            'max_results': max_results,
+            'sort_by': sort_by,
+            'pmids': pmids,
+            'timestamp': time.time()
+        }
+        self._put_entry(cache_key, cache_data, list(pmids))
+    
+    def put_pmid(self, pmid: str, article: Dict):
+        """按PMID缓存文章信息"""
+        self.put_pmids([article], [pmid])
+    
+    def put_pmids(self, articles: List[Dict], pmids: Optional[List[str]] = None):
+        """批量按PMID缓存文章信息，索引更新与淘汰在一个事务中完成"""
+        if pmids is None:
+            pmids = [article['pmid'] for article in articles]
+        timestamp = time.time()
+        entries = []
+        for pmid, article in zip(pmids, articles):
+            article = _copy_article(article)
+            entries.append((pmid, {'pmid': pmid, 'article': article, 'timestamp': timestamp}, article))
+        if entries:
+            self._put_entries(entries)
+    
+    def _put_entry(self, cache_key: str, cache_data: Dict, value: Any):
+        """写入单个缓存条目，value为内存层中保存的内容"""
+        self._put_entries([(cache_key, cache_data, value)])
+    
+    def _put_entries(self, entries: List[Tuple[str, Dict, Any]]):
+        """写入缓存文件，并在一个事务中更新LRU索引、按容量淘汰；失败时删除本次写入的文件"""
         with self.lock:
-            # LRU缓存清理
-            cache_files = [f for f in os.listdir(self.cache_dir) if f.endswith('.json')]
-            if len(cache_files) >= self.max_size:
-                # 删除最老的缓存文件
-                cache_files.sort(key=lambda f: os.path.getmtime(os.path.join(self.cache_dir, f)))
-                oldest_file = cache_files[0]
-                os.remove(os.path.join(self.cache_dir, oldest_file))
-                self.stats['evictions'] += 1
-            
-            # 保存缓存
-            cache_data = {
-                'query': query,
-                'max_results': max_results,
-                'sort_by': sort_by,
-                'pmids': pmids,
-                'timestamp': time.time()
-            }
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            written = []
+            try:
+                # 保存缓存
+                sizes = []
+                for cache_key, cache_data, _ in entries:
+                    cache_file = self._get_cache_file_path(cache_key)
+                    written.append(cache_file)
+                    with open(cache_file, 'wb') as f:
+                        sizes.append(f.write(_json_dumps(cache_data)))
+                
+                # 先同步内存命中的访问时间，保证淘汰顺序仍是LRU
+                with self._mem_lock:
+                    pending = [(atime, key) for key, atime in self._pending_atime.items()]
+                    self._pending_atime.clear()
+                
+                now = time.time()
+                self.db.execute('BEGIN')
+                if pending:
+                    self.db.executemany('UPDATE cache SET atime = ? WHERE key = ?', pending)
+                
+                for (cache_key, _, value), size in zip(entries, sizes):
+                    updated = self.db.execute(
+                        'UPDATE cache SET atime = ?, size = ? WHERE key = ?',
+                        (now, size, cache_key)
+                    ).rowcount
+                    if not updated:
+                        self.db.execute('INSERT INTO cache VALUES (?, ?, ?)', (cache_key, now, size))
+                        self._count += 1
+                    self._remember(cache_key, now + self.ttl, value)
+                
+                # LRU缓存清理：按访问时间淘汰超出容量的条目
+                overflow = self._count - self.max_size
+                if overflow > 0:
+                    stale_keys = [row[0] for row in self.db.execute(
+                        'SELECT key FROM cache ORDER BY atime LIMIT ?', (overflow,)
+                    )]
+                    for stale_key in stale_keys:
+                        self._remove_entry(stale_key)
+                    self._count_stat('evictions', len(stale_keys))
+                self.db.execute('COMMIT')
+            except Exception:
+                if self.db.in_transaction:
+                    self.db.execute('ROLLBACK')
+                # 索引未提交，本次写入的文件不会被LRU淘汰看到，删除以免残留
+                with self._mem_lock:
+                    for cache_key, _, _ in entries:
+                        self._mem.pop(cache_key, None)
+                for cache_file in written:
+                    try:
+                        os.remove(cache_file)
+                    except OSError:
+                        pass
+                self._count = self.db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+                raise
     
     def clear(self):
         """清除所有缓存"""
@@ -122,27 +368,62 @@ class SearchResultCache:
             cache_files = [f for f in os.listdir(self.cache_dir) if f.endswith('.json')]
             for cache_file in cache_files:
                 os.remove(os.path.join(self.cache_dir, cache_file))
-            self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+            self.db.execute('DELETE FROM cache')
+            self._count = 0
+            with self._mem_lock:
+                self._mem.clear()
+                self._pending_atime.clear()
+            with self._stats_lock:
+                self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
     
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        total_requests = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / total_requests if total_requests > 0 else 0
+        
+        return {
+            'cache_size': self._count,
+            'max_cache_size': self.max_size,
+            'hit_rate': hit_rate,
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'evictions': stats['evictions']
+        }
+    
+    def close(self):
+        """关闭LRU索引数据库"""
         with self.lock:
-            total_requests = self.stats['hits'] + self.stats['misses']
-            hit_rate = self.stats['hits'] / total_requests if total_requests > 0 else 0
-            
-            return {
-                'cache_size': len([f for f in os.listdir(self.cache_dir) if f.endswith('.json')]),
-                'max_cache_size': self.max_size,
-                'hit_rate': hit_rate,
-                'hits': self.stats['hits'],
-                'misses': self.stats['misses'],
-                'evictions': self.stats['evictions']
-            }
+            self.db.close()
 
 
 class PubMedSearcher:
     """PubMed搜索和数据处理类 v2.0"""
     
+    # 预编译的XPath表达式，逐篇提取时复用
+    # 文本结果关闭smart_strings，返回普通str而不引用所在元素，文章字典不会让已解析的XML树驻留内存
+    _XP_PMID = lxml_etree.XPath('string(.//PMID)', smart_strings=False)
+    _XP_TITLE = lxml_etree.XPath('string(.//ArticleTitle)', smart_strings=False)
+    _XP_JOURNAL = lxml_etree.XPath('string(.//Journal/Title)', smart_strings=False)
+    _XP_VOLUME = lxml_etree.XPath('string(.//JournalIssue/Volume)', smart_strings=False)
+    _XP_ISSUE = lxml_etree.XPath('string(.//JournalIssue/Issue)', smart_strings=False)
+    _XP_MEDLINE_PGN = lxml_etree.XPath('string(.//Pagination/MedlinePgn)', smart_strings=False)
+    _XP_START_PAGE = lxml_etree.XPath('(.//Pagination/StartPage)[1]')
+    _XP_END_PAGE = lxml_etree.XPath('(.//Pagination/EndPage)[1]')
+    _XP_ISSN = lxml_etree.XPath('.//Journal/ISSN')
+    _XP_ABSTRACT_TEXTS = lxml_etree.XPath('.//AbstractText')
+    # 自适应批大小参数
+    _BATCH_TARGET_BYTES = 2_000_000
+    _BATCH_MIN = 50
+    _BATCH_MAX = 500
+    _BATCH_STEP = 25
+    
+    # esummary DocSum
+    _XP_DOCSUM_ID = lxml_etree.XPath('string(Id)', smart_strings=False)
+    _XP_DOCSUM_ISSN = lxml_etree.XPath("string(Item[@Name='ISSN'])", smart_strings=False)
+    _XP_DOCSUM_ESSN = lxml_etree.XPath("string(Item[@Name='ESSN'])", smart_strings=False)
+    
     def __init__(self, config: SearchConfig = None):
         """
         初始化PubMed搜索器
@@ -154,6 +435,11 @@ class PubMedSearcher:
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
         self.esearch_url = f"{self.base_url}esearch.fcgi"
         self.efetch_url = f"{self.base_url}efetch.fcgi"
+        self.epost_url = f"{self.base_url}epost.fcgi"
+        self.esummary_url = f"{self.base_url}esummary.fcgi"
+        
+        # NCBI限速：无API key时3次/秒，有API key时10次/秒
+        self.rate_limiter = _RateLimiter(10 if self.config.api_key else 3)
         
         # 初始化缓存
         self.cache = SearchResultCache(
@@ -161,6 +447,14 @@ class PubMedSearcher:
             ttl=self.config.cache_ttl
         ) if self.config.enable_cache else None
         
+        # 按PMID缓存的文章详情，不同检索结果重叠时无需重复获取
+        self.article_cache = SearchResultCache(
+            cache_dir=_ARTICLE_CACHE_DIR,
+            max_size=self.config.article_cache_max_size,
+            ttl=self.config.article_cache_ttl,
+            mem_max_size=2000
+        ) if self.config.enable_cache else None
+        
         # 性能统计
         self.performance_stats = {
             'total_searches': 0,
@@ -171,8 +465,16 @@ class PubMedSearcher:
             'errors': 0,
             'retries': 0,
             'parse_time': 0.0,
-            'articles_parsed': 0
+            'articles_parsed': 0,
+            'bytes_received': 0
         }
+        # 检索可被多个线程并发调用（epost也在线程中执行），计数更新需加锁
+        self._stats_lock = threading.Lock()
+        
+        # 自适应批大小（AIMD）：成功时线性增加，遇到限流或服务端错误时减半
+        self._adaptive_batch_size = self.config.batch_size
+        # 每篇文章XML的平均字节数（指数移动平均），用于把单批响应控制在目标大小内
+        self._avg_bytes_per_pmid = None
         
         # 请求会话
         self.session = requests.Session()
@@ -180,9 +482,13 @@ class PubMedSearcher:
             'User-Agent': f'{self.config.tool}/{self.config.email}'
         })
         
-        # 异步会话
+        # 异步会话（首次异步请求时创建，通过aclose()关闭）
         self.async_session = None
-        self.thread_pool = ThreadPoolExecutor(max_workers=4) if self.config.enable_async else None
+        self._async_session_loop = None
+        
+        # 进行中的检索：(query, max_results, sort_by) -> {'event', 'pmids'}
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
         
     def search_articles(self, query: str, max_results: int = None, 
                        sort_by: str = None) -> List[str]:
@@ -201,17 +507,47 @@ class PubMedSearcher:
         max_results = max_results or self.config.max_results
         sort_by = sort_by or self.config.sort_by
         
-        self.performance_stats['total_searches'] += 1
+        self._count_stat('total_searches')
         print(f"正在搜索关键词: '{query}'...")
         
         # 检查缓存
         if self.cache:
             cached_pmids = self.cache.get(query, max_results, sort_by)
             if cached_pmids:
-                self.performance_stats['cache_hits'] += 1
+                self._count_stat('cache_hits')
                 print(f"缓存命中: 找到 {len(cached_pmids)} 篇文章")
                 return cached_pmids
         
+        # 同一检索已在进行时等待其结果，避免并发未命中重复请求API
+        flight_key = (query, max_results, sort_by)
+        with self._inflight_lock:
+            flight = self._inflight.get(flight_key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._inflight[flight_key] = {'event': threading.Event(), 'pmids': [], 'error': None}
+        
+        if not is_leader:
+            print("相同检索正在进行，等待其结果...")
+            flight['event'].wait()
+            # 首个请求失败时同样抛出其异常，不把空结果当作有效结果返回
+            if flight['error'] is not None:
+                raise flight['error']
+            return list(flight['pmids'])
+        
+        try:
+            pmids = self._search_uncached(query, max_results, sort_by, start_time)
+            flight['pmids'] = pmids
+            return pmids
+        except BaseException as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(flight_key, None)
+            flight['event'].set()
+    
+    def _search_uncached(self, query: str, max_results: int, sort_by: str, start_time: float) -> List[str]:
+        """调用esearch检索并写入缓存"""
         # 构建请求参数
         params = {
             'db': 'pubmed',
@@ -222,6 +558,8 @@ class PubMedSearcher:
             'tool': self.config.tool,
             'retmode': 'json'
         }
+        if self.config.api_key:
+            params['api_key'] = self.config.api_key
         
         # 执行请求（带重试机制）
         pmids = self._execute_request_with_retry(
@@ -235,11 +573,11 @@ class PubMedSearcher:
             
             # 更新统计
             latency = time.time() - start_time
-            self.performance_stats['total_latency'] += latency
+            self._count_stat('total_latency', latency)
             print(f"找到 {len(pmids)} 篇文章，耗时: {latency:.2f}秒")
         else:
             print("搜索失败")
-            self.performance_stats['errors'] += 1
+            self._count_stat('errors')
         
         return pmids
     
@@ -249,7 +587,7 @@ class PubMedSearcher:
         
         for attempt in range(self.config.max_retries):
             try:
-                self.performance_stats['api_calls'] += 1
+                self._count_stat('api_calls')
                 
                 # 智能延迟
                 if attempt > 0:
@@ -257,6 +595,7 @@ class PubMedSearcher:
                     print(f"{operation}重试 {attempt + 1}/{self.config.max_retries}，等待 {delay:.1f}秒...")
                     time.sleep(delay)
                 
+                self.rate_limiter.acquire()
                 response = self.session.get(url, params=params, timeout=30)
                 
                 # 检查API限制
@@ -269,11 +608,9 @@ class PubMedSearcher:
                 response.raise_for_status()
                 
                 # 解析响应
-                data = response.json()
-                pmids = data.get('esearchresult', {}).get('idlist', [])
+                pmids, count = _parse_esearch_response(response.content)
                 
                 if pmids:
-                    count = int(data.get('esearchresult', {}).get('count', 0))
                     print(f"{operation}成功: 总计 {count} 篇文章，获取 {len(pmids)} 篇")
                     return pmids
                 else:
@@ -282,7 +619,7 @@ class PubMedSearcher:
                     
             except requests.RequestException as e:
                 last_error = e
-                self.performance_stats['retries'] += 1
+                self._count_stat('retries')
                 print(f"{operation}请求失败 (尝试 {attempt + 1}/{self.config.max_retries}): {e}")
                 
                 if attempt == self.config.max_retries - 1:
@@ -295,13 +632,14 @@ class PubMedSearcher:
                 if attempt == self.config.max_retries - 1:
                     break
         
-        self.performance_stats['errors'] += 1
+        self._count_stat('errors')
         print(f"{operation}最终失败: {last_error}")
         return []
     
     def fetch_article_details(self, pmids: List[str]) -> List[Dict]:
         """
         获取文章详细信息 - 优化版
+        启用异步时并发获取各批次，否则按批次顺序获取
         
         Args:
             pmids: PMID列表
@@ -312,30 +650,53 @@ class PubMedSearcher:
         if not pmids:
             return []
         
-        print(f"正在获取 {len(pmids)} 篇文章的详细信息...")
+        if self.config.enable_async:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # 当前线程没有运行中的事件循环，可以直接驱动异步流程
+                return asyncio.run(self._fetch_article_details_async_once(pmids))
+        
+        return self._fetch_article_details_sync(pmids)
+    
+    async def _fetch_article_details_async_once(self, pmids: List[str]) -> List[Dict]:
+        """供同步调用使用：异步获取后关闭会话（会话绑定的事件循环随asyncio.run结束）"""
+        try:
+            return await self.fetch_article_details_async(pmids)
+        finally:
+            await self.aclose()
+    
+    def _fetch_article_details_sync(self, pmids: List[str]) -> List[Dict]:
+        """按批次顺序同步获取文章详细信息"""
+        pmids, cached, missing_pmids = self._split_cached_articles(pmids)
+        if not missing_pmids:
+            return self._merge_cached_articles(pmids, cached, [])
+        
+        print(f"正在获取 {len(missing_pmids)} 篇文章的详细信息...")
         
         # 动态批处理大小
-        batch_size = self._calculate_optimal_batch_size(len(pmids))
+        batch_size = self._calculate_optimal_batch_size(len(missing_pmids))
         all_articles = []
         
+        # 多批次时先通过ePost上传PMID列表，各批次只需引用服务器端历史记录
+        history = self._epost(missing_pmids) if len(missing_pmids) > batch_size else None
+        
         # 同步批处理
-        for i in range(0, len(pmids), batch_size):
-            batch_pmids = pmids[i:i + batch_size]
+        for i in range(0, len(missing_pmids), batch_size):
+            batch_pmids = missing_pmids[i:i + batch_size]
             current_batch = i//batch_size + 1
-            total_batches = (len(pmids) + batch_size - 1) // batch_size
-            print(f"处理第 {current_batch}/{total_batches} 批 ({len(batch_pmids)} 篇)...")
+            total_batches = (len(missing_pmids) + batch_size - 1) // batch_size
+            logger.info("处理第 %d/%d 批 (%d 篇)", current_batch, total_batches, len(batch_pmids))
             
-            articles = self._fetch_batch_with_retry(batch_pmids)
+            articles = self._fetch_batch_with_retry(batch_pmids, history, i)
             all_articles.extend(articles)
-            
-            # 批次间延迟
-            if i + batch_size < len(pmids):  # 不是最后一批
-                print(f"等待 {self.config.request_delay} 秒后处理下一批...")
-                time.sleep(self.config.request_delay)
+        
+        if history:
+            self._restore_input_order(all_articles, missing_pmids)
         
         print(f"成功获取 {len(all_articles)} 篇文章信息")
-        self.performance_stats['total_articles'] += len(all_articles)
-        return all_articles
+        self._count_stat('total_articles', len(all_articles))
+        return self._merge_cached_articles(pmids, cached, all_articles)
     
     def fetch_article_issn_only(self, pmids: List[str]) -> List[Dict]:
         """
@@ -356,20 +717,21 @@ class PubMedSearcher:
         batch_size = self._calculate_optimal_batch_size(len(pmids))
         all_articles = []
         
+        # 多批次时先通过ePost上传PMID列表，各批次只需引用服务器端历史记录
+        history = self._epost(pmids) if len(pmids) > batch_size else None
+        
         # 同步批处理
         for i in range(0, len(pmids), batch_size):
             batch_pmids = pmids[i:i + batch_size]
             current_batch = i//batch_size + 1
             total_batches = (len(pmids) + batch_size - 1) // batch_size
-            print(f"处理第 {current_batch}/{total_batches} 批 ({len(batch_pmids)} 篇)...")
+            logger.info("处理第 %d/%d 批 (%d 篇)", current_batch, total_batches, len(batch_pmids))
             
-            articles = self._fetch_batch_issn_only_with_retry(batch_pmids)
+            articles = self._fetch_batch_issn_only_with_retry(batch_pmids, history, i)
             all_articles.extend(articles)
-            
-            # 批次间延迟
-            if i + batch_size < len(pmids):  # 不是最后一批
-                print(f"等待 {self.config.request_delay} 秒后处理下一批...")
-                time.sleep(self.config.request_delay)
+        
+        if history:
+            self._restore_input_order(all_articles, pmids)
         
         print(f"成功获取 {len(all_articles)} 篇文章的ISSN/EISSN信息")
         return all_articles
@@ -388,28 +750,32 @@ class PubMedSearcher:
             return []
         
         if not self.config.enable_async:
-            return self.fetch_article_details(pmids)
+            return self._fetch_article_details_sync(pmids)
+        
+        pmids, cached, missing_pmids = self._split_cached_articles(pmids)
+        if not missing_pmids:
+            return self._merge_cached_articles(pmids, cached, [])
         
-        print(f"异步获取 {len(pmids)} 篇文章的详细信息...")
+        print(f"异步获取 {len(missing_pmids)} 篇文章的详细信息...")
         
-        # 创建异步会话
-        if not self.async_session:
-            self.async_session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=60),
-                headers={
-                    'User-Agent': f'{self.config.tool}/{self.config.email}'
-                }
-            )
+        # 获取（或复用）带连接池的异步会话
+        self._ensure_async_session()
         
         # 动态批处理
-        batch_size = self._calculate_optimal_batch_size(len(pmids))
+        batch_size = self._calculate_optimal_batch_size(len(missing_pmids))
         all_articles = []
         
-        # 创建异步任务
+        # 多批次时先通过ePost上传PMID列表
+        history = None
+        if len(missing_pmids) > batch_size:
+            history = await _run_in_thread(self._epost, missing_pmids)
+        
+        # 创建异步任务，用信号量限制同时进行的请求数
+        semaphore = asyncio.Semaphore(self.config.max_concurrent)
         tasks = []
-        for i in range(0, len(pmids), batch_size):
-            batch_pmids = pmids[i:i + batch_size]
-            task = self._fetch_batch_async(batch_pmids)
+        for i in range(0, len(missing_pmids), batch_size):
+            batch_pmids = missing_pmids[i:i + batch_size]
+            task = self._fetch_batch_async(batch_pmids, semaphore, history, i)
             tasks.append(task)
         
         # 并发执行
@@ -419,92 +785,236 @@ class PubMedSearcher:
         for i, result in enumerate(results):
             if isinstance(result, Exception):
                 print(f"第 {i + 1} 批异步获取失败: {result}")
-                self.performance_stats['errors'] += 1
+                self._count_stat('errors')
             else:
                 all_articles.extend(result)
         
-        # 关闭异步会话
-        await self.async_session.close()
-        self.async_session = None
+        if history:
+            self._restore_input_order(all_articles, missing_pmids)
         
         print(f"异步成功获取 {len(all_articles)} 篇文章信息")
-        self.performance_stats['total_articles'] += len(all_articles)
-        return all_articles
+        self._count_stat('total_articles', len(all_articles))
+        return self._merge_cached_articles(pmids, cached, all_articles)
     
-    def _calculate_optimal_batch_size(self, total_pmids: int) -> int:
-        """计算最优批处理大小"""
-        # 使用配置的固定批次大小，但不超过总数量
-        return min(self.config.batch_size, total_pmids)
+    def _split_cached_articles(self, pmids: List[str]) -> Tuple[List[str], Dict[str, Dict], List[str]]:
+        """
+        PMID去重并查询文章缓存
+        
+        Returns:
+            (去重后的PMID列表, 缓存命中的文章, 需要请求的PMID列表)
+        """
+        unique_pmids = list(dict.fromkeys(pmids))
+        cached = {}
+        
+        if self.article_cache:
+            for pmid in unique_pmids:
+                article = self.article_cache.get_pmid(pmid)
+                if article:
+                    cached[pmid] = article
+            if cached:
+                print(f"文章缓存命中 {len(cached)}/{len(unique_pmids)} 篇")
+        
+        missing_pmids = [pmid for pmid in unique_pmids if pmid not in cached] if cached else unique_pmids
+        return unique_pmids, cached, missing_pmids
     
-    def _fetch_batch_with_retry(self, batch_pmids: List[str]) -> List[Dict]:
-        """获取一批文章详细信息（带重试）"""
+    def _merge_cached_articles(self, pmids: List[str], cached: Dict[str, Dict],
+                               fetched: List[Dict]) -> List[Dict]:
+        """缓存新获取的文章，并与缓存命中的文章按输入顺序合并"""
+        if self.article_cache:
+            self.article_cache.put_pmids([article for article in fetched if article.get('pmid')])
+        
+        if not cached:
+            return fetched
+        
+        articles_by_pmid = dict(cached)
+        for article in fetched:
+            articles_by_pmid.setdefault(article.get('pmid'), article)
+        return [articles_by_pmid[pmid] for pmid in pmids if pmid in articles_by_pmid]
+    
+    def _epost(self, pmids: List[str]) -> Optional[Tuple[str, str]]:
+        """
+        通过ePost将PMID列表上传到NCBI历史服务器
+        
+        Args:
+            pmids: PMID列表
+        
+        Returns:
+            (WebEnv, query_key)，失败或PMID有重复时返回None（调用方回退为按ID请求）
+        """
+        # 服务器端会对PMID去重，重复时按位置分页会错位
+        if len(set(pmids)) != len(pmids):
+            return None
+        
         params = {
             'db': 'pubmed',
-            'id': ','.join(batch_pmids),
-            'retmode': 'xml',
+            'id': ','.join(pmids),
             'email': self.config.email,
             'tool': self.config.tool
         }
+        if self.config.api_key:
+            params['api_key'] = self.config.api_key
         
-        for attempt in range(self.config.max_retries):
-            try:
-                response = self.session.get(self.efetch_url, params=params, timeout=60)
-                
-                # 检查API限制
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('retry-after', 60))
-                    print(f"API限制，等待 {retry_after} 秒...")
-                    time.sleep(retry_after)
-                    continue
-                
-                response.raise_for_status()
-                
-                articles = self._parse_xml_response_optimized(response.text)
-                return articles
-                
-            except requests.RequestException as e:
-                self.performance_stats['retries'] += 1
-                if attempt == self.config.max_retries - 1:
-                    print(f"获取批次失败: {e}")
-                    self.performance_stats['errors'] += 1
-                    return []
-                
-                delay = min(self.config.request_delay * (2 ** attempt), 10.0)
-                time.sleep(delay)
+        try:
+            self._count_stat('api_calls')
+            self.rate_limiter.acquire()
+            response = self.session.post(self.epost_url, data=params, timeout=30)
+            response.raise_for_status()
+            
+            root = lxml_etree.fromstring(response.content)
+            webenv = root.findtext('WebEnv')
+            query_key = root.findtext('QueryKey')
+            if webenv and query_key:
+                return webenv, query_key
+            print(f"ePost未返回历史记录: {root.findtext('.//ERROR') or '未知错误'}")
+        except (requests.RequestException, lxml_etree.XMLSyntaxError) as e:
+            print(f"ePost失败，改为按PMID直接获取: {e}")
         
-        return []
+        return None
     
-    def _fetch_batch_issn_only_with_retry(self, batch_pmids: List[str]) -> List[Dict]:
-        """获取一批文章的ISSN信息（带重试）"""
+    def _build_efetch_params(self, batch_pmids: List[str],
+                             history: Optional[Tuple[str, str]] = None, retstart: int = 0) -> Dict:
+        """构建efetch请求参数，有历史记录时按位置分页引用，否则直接传PMID"""
         params = {
             'db': 'pubmed',
-            'id': ','.join(batch_pmids),
             'retmode': 'xml',
             'email': self.config.email,
             'tool': self.config.tool
         }
+        if self.config.api_key:
+            params['api_key'] = self.config.api_key
+        if history:
+            params['WebEnv'], params['query_key'] = history
+            params['retstart'] = str(retstart)
+            params['retmax'] = str(len(batch_pmids))
+        else:
+            params['id'] = ','.join(batch_pmids)
+        return params
+    
+    @staticmethod
+    def _restore_input_order(articles: List[Dict], pmids: List[str]):
+        """按输入PMID的顺序排列结果（历史服务器返回的顺序可能不同）"""
+        order = {pmid: i for i, pmid in enumerate(pmids)}
+        articles.sort(key=lambda article: order.get(article.get('pmid'), len(order)))
+    
+    def _ensure_async_session(self):
+        """
+        创建或复用异步会话，连接池在多次调用间保持
+        会话绑定创建时的事件循环，循环变化时重新创建
+        """
+        loop = asyncio.get_running_loop()
+        if self.async_session and not self.async_session.closed and self._async_session_loop is loop:
+            return self.async_session
+        
+        # 总连接数留出余量给ePost等附加请求，单主机并发仍受max_concurrent限制
+        connector = aiohttp.TCPConnector(
+            limit=self.config.max_concurrent * 2,
+            limit_per_host=self.config.max_concurrent,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+        self.async_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=60),
+            headers={
+                'User-Agent': f'{self.config.tool}/{self.config.email}'
+            }
+        )
+        self._async_session_loop = loop
+        return self.async_session
+    
+    async def aclose(self):
+        """关闭异步会话及其连接池"""
+        if self.async_session and not self.async_session.closed:
+            await self.async_session.close()
+        self.async_session = None
+        self._async_session_loop = None
+    
+    def _calculate_optimal_batch_size(self, total_pmids: int) -> int:
+        """
+        计算最优批处理大小
+        以配置的batch_size为上限，按观测到的每篇字节数把单批响应控制在约2MB，
+        并叠加AIMD调整的当前批大小
+        """
+        ceiling = min(self.config.batch_size, self._BATCH_MAX)
+        if self._avg_bytes_per_pmid:
+            by_payload = int(self._BATCH_TARGET_BYTES / self._avg_bytes_per_pmid)
+            ceiling = min(ceiling, max(self._BATCH_MIN, by_payload))
+        
+        return max(1, min(self._adaptive_batch_size, ceiling, total_pmids))
+    
+    def _on_batch_succeeded(self):
+        """批次成功：加性增加批大小"""
+        self._adaptive_batch_size = min(
+            self._adaptive_batch_size + self._BATCH_STEP, self.config.batch_size
+        )
+    
+    def _on_batch_throttled(self):
+        """批次被限流或服务端出错：批大小减半"""
+        floor = min(self._BATCH_MIN, self.config.batch_size)
+        self._adaptive_batch_size = max(floor, self._adaptive_batch_size // 2)
+        logger.info("批大小调整为 %d", self._adaptive_batch_size)
+    
+    def _fetch_batch_with_retry(self, batch_pmids: List[str],
+                                history: Optional[Tuple[str, str]] = None, retstart: int = 0) -> List[Dict]:
+        """获取一批文章详细信息（带重试）"""
+        return self._fetch_batch(
+            batch_pmids, self._parse_xml_response_optimized, "获取批次失败", history, retstart
+        )
+    
+    def _fetch_batch_issn_only_with_retry(self, batch_pmids: List[str],
+                                          history: Optional[Tuple[str, str]] = None, retstart: int = 0) -> List[Dict]:
+        """获取一批文章的ISSN信息（带重试），使用esummary的DocSum摘要代替完整文章XML"""
+        return self._fetch_batch(
+            batch_pmids, self._parse_xml_response_issn_only, "获取批次ISSN/EISSN信息失败", history, retstart,
+            url=self.esummary_url
+        )
+    
+    def _fetch_batch(self, batch_pmids: List[str], parser, error_label: str,
+                     history: Optional[Tuple[str, str]] = None, retstart: int = 0,
+                     url: Optional[str] = None) -> List[Dict]:
+        """
+        获取一批文章并解析（带重试）
+        
+        Args:
+            batch_pmids: 本批PMID列表
+            parser: 响应解析函数，接收字节块迭代器
+            error_label: 最终失败时的提示信息
+            history: ePost返回的(WebEnv, query_key)
+            retstart: 本批在历史记录中的起始位置
+            url: 请求地址，默认为efetch
+        
+        Returns:
+            文章信息列表
+        """
+        params = self._build_efetch_params(batch_pmids, history, retstart)
         
         for attempt in range(self.config.max_retries):
             try:
-                response = self.session.get(self.efetch_url, params=params, timeout=60)
-                
-                # 检查API限制
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('retry-after', 60))
-                    print(f"API限制，等待 {retry_after} 秒...")
-                    time.sleep(retry_after)
-                    continue
-                
-                response.raise_for_status()
-                
-                articles = self._parse_xml_response_issn_only(response.text)
-                return articles
+                self.rate_limiter.acquire()
+                # 流式读取响应，边下载边解析
+                with self.session.get(url or self.efetch_url, params=params, timeout=60, stream=True) as response:
+                    # 检查API限制
+                    if response.status_code == 429:
+                        self._on_batch_throttled()
+                        retry_after = int(response.headers.get('retry-after', 60))
+                        print(f"API限制，等待 {retry_after} 秒...")
+                        time.sleep(retry_after)
+                        continue
+                    
+                    response.raise_for_status()
+                    
+                    articles = parser(response.iter_content(chunk_size=65536))
+                    self._on_batch_succeeded()
+                    return articles
                 
             except requests.RequestException as e:
-                self.performance_stats['retries'] += 1
+                if isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code >= 500:
+                    self._on_batch_throttled()
+                self._count_stat('retries')
                 if attempt == self.config.max_retries - 1:
-                    print(f"获取批次ISSN/EISSN信息失败: {e}")
-                    self.performance_stats['errors'] += 1
+                    print(f"{error_label}: {e}")
+                    self._count_stat('errors')
                     return []
                 
                 delay = min(self.config.request_delay * (2 ** attempt), 10.0)
@@ -512,34 +1022,41 @@ class PubMedSearcher:
         
         return []
     
-    async def _fetch_batch_async(self, batch_pmids: List[str]) -> List[Dict]:
+    async def _fetch_batch_async(self, batch_pmids: List[str],
+                                 semaphore: Optional[asyncio.Semaphore] = None,
+                                 history: Optional[Tuple[str, str]] = None,
+                                 retstart: int = 0) -> List[Dict]:
         """异步获取一批文章详细信息"""
-        params = {
-            'db': 'pubmed',
-            'id': ','.join(batch_pmids),
-            'retmode': 'xml',
-            'email': self.config.email,
-            'tool': self.config.tool
-        }
+        if semaphore is not None:
+            async with semaphore:
+                return await self._fetch_batch_async(batch_pmids, None, history, retstart)
+        
+        params = self._build_efetch_params(batch_pmids, history, retstart)
         
         for attempt in range(self.config.max_retries):
             try:
+                await self.rate_limiter.acquire_async()
                 async with self.async_session.get(self.efetch_url, params=params) as response:
                     if response.status == 429:
+                        self._on_batch_throttled()
                         retry_after = int(response.headers.get('retry-after', 60))
                         print(f"API限制，等待 {retry_after} 秒...")
                         await asyncio.sleep(retry_after)
                         continue
                     
                     response.raise_for_status()
-                    xml_content = await response.text()
-                    articles = self._parse_xml_response_optimized(xml_content)
+                    articles = await self._parse_articles_async(
+                        response, self._extract_article_info, "XML解析错误"
+                    )
+                    self._on_batch_succeeded()
                     return articles
                     
             except Exception as e:
+                if isinstance(e, aiohttp.ClientResponseError) and e.status >= 500:
+                    self._on_batch_throttled()
                 if attempt == self.config.max_retries - 1:
                     print(f"异步获取批次失败: {e}")
-                    self.performance_stats['errors'] += 1
+                    self._count_stat('errors')
                     return []
                 
                 delay = min(self.config.request_delay * (2 ** attempt), 10.0)
@@ -547,118 +1064,175 @@ class PubMedSearcher:
         
         return []
     
-    def _parse_xml_response_optimized(self, xml_content: str) -> List[Dict]:
+    def _create_article_parser(self, tag: str = 'PubmedArticle'):
+        """创建增量XML解析器，只在单篇记录元素（默认PubmedArticle）结束时产生事件"""
+        return lxml_etree.XMLPullParser(
+            events=('end',), tag=tag, remove_blank_text=True
+        )
+    
+    def _drain_articles(self, parser, extractor, articles: List[Dict]):
+        """取出解析器中已完整的文章元素，提取信息后立即释放"""
+        for _, elem in parser.read_events():
+            # 提取失败只影响当前记录，不中断整批解析
+            try:
+                article_info = extractor(elem)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.debug("提取文章信息失败: %s", e)
+                self._count_stat('errors')
+                article_info = None
+            if article_info:
+                articles.append(article_info)
+            # 释放已处理的元素及其之前的兄弟节点，内存占用保持在单篇文章级别
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    
+    def _count_stat(self, key: str, amount=1):
+        """线程安全地累加一项性能计数"""
+        with self._stats_lock:
+            self.performance_stats[key] += amount
+    
+    def _record_parse_stats(self, start_time: float, article_count: int,
+                            byte_count: int = 0, tag: str = 'PubmedArticle'):
+        """更新解析性能统计，完整文章响应同时更新每篇平均字节数"""
+        with self._stats_lock:
+            stats = self.performance_stats
+            stats['parse_time'] += time.time() - start_time
+            stats['articles_parsed'] += article_count
+            stats['bytes_received'] += byte_count
+        
+        if tag == 'PubmedArticle' and article_count and byte_count:
+            bytes_per_pmid = byte_count / article_count
+            if self._avg_bytes_per_pmid is None:
+                self._avg_bytes_per_pmid = bytes_per_pmid
+            else:
+                self._avg_bytes_per_pmid = 0.8 * self._avg_bytes_per_pmid + 0.2 * bytes_per_pmid
+    
+    def _parse_articles(self, xml_chunks, extractor, error_label: str,
+                        tag: str = 'PubmedArticle') -> List[Dict]:
         """
-        优化的XML响应解析方法，使用lxml提高解析速度
+        增量解析efetch/esummary返回的XML，边接收边解析
         
         Args:
-            xml_content: XML内容
+            xml_chunks: XML内容（bytes或str），或字节块迭代器（如response.iter_content()）
+            extractor: 单篇文章信息提取函数
+            error_label: 解析失败时的提示信息
+            tag: 单篇记录的元素名
         
         Returns:
             文章信息列表
         """
+        if isinstance(xml_chunks, str):
+            xml_chunks = xml_chunks.encode('utf-8')
+        if isinstance(xml_chunks, bytes):
+            xml_chunks = (xml_chunks,)
+        
         start_time = time.time()
         articles = []
+        byte_count = 0
         
         try:
-            # 使用lxml进行更快的XML解析
-            root = lxml_etree.fromstring(xml_content.encode('utf-8'))
-            
-            # 使用XPath优化查找性能
-            article_elements = root.xpath('.//PubmedArticle')
-            
-            # 并行处理文章解析
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                future_to_article = {
-                    executor.submit(self._extract_article_info, article): article 
-                    for article in article_elements
-                }
-                
-                for future in future_to_article:
-                    try:
-                        article_info = future.result(timeout=30)
-                        if article_info:
-                            articles.append(article_info)
-                    except Exception as e:
-                        print(f"文章解析失败: {e}")
-                        self.performance_stats['errors'] += 1
-            
-            # 更新性能统计
-            parse_time = time.time() - start_time
-            self.performance_stats['parse_time'] += parse_time
-            self.performance_stats['articles_parsed'] += len(articles)
+            parser = self._create_article_parser(tag)
+            for chunk in xml_chunks:
+                byte_count += len(chunk)
+                parser.feed(chunk)
+                self._drain_articles(parser, extractor, articles)
+            parser.close()
+            self._drain_articles(parser, extractor, articles)
             
+            self._record_parse_stats(start_time, len(articles), byte_count, tag)
             return articles
             
+        except requests.RequestException:
+            # 读取响应过程中的网络错误交由调用方重试
+            raise
         except Exception as e:
-            print(f"XML解析错误: {e}")
-            self.performance_stats['errors'] += 1
+            print(f"{error_label}: {e}")
+            self._count_stat('errors')
             return []
     
-    def _parse_xml_response_issn_only(self, xml_content: str) -> List[Dict]:
+    async def _parse_articles_async(self, response, extractor, error_label: str) -> List[Dict]:
         """
-        只解析ISSN和EISSN信息的XML响应
+        从aiohttp响应流中增量解析XML，网络接收与解析交替进行
         
         Args:
-            xml_content: XML内容
+            response: aiohttp响应对象
+            extractor: 单篇文章信息提取函数
+            error_label: 解析失败时的提示信息
         
         Returns:
-            只包含PMID、ISSN、EISSN的文章信息列表
+            文章信息列表
         """
         start_time = time.time()
         articles = []
+        byte_count = 0
         
         try:
-            # 使用lxml进行更快的XML解析
-            root = lxml_etree.fromstring(xml_content.encode('utf-8'))
-            
-            # 使用XPath优化查找性能
-            article_elements = root.xpath('.//PubmedArticle')
-            
-            for article_element in article_elements:
-                article_info = self._extract_issn_info(article_element)
-                if article_info:
-                    articles.append(article_info)
-            
-            # 更新性能统计
-            parse_time = time.time() - start_time
-            self.performance_stats['parse_time'] += parse_time
-            self.performance_stats['articles_parsed'] += len(articles)
+            parser = self._create_article_parser()
+            async for chunk in response.content.iter_chunked(65536):
+                byte_count += len(chunk)
+                parser.feed(chunk)
+                self._drain_articles(parser, extractor, articles)
+            parser.close()
+            self._drain_articles(parser, extractor, articles)
             
+            self._record_parse_stats(start_time, len(articles), byte_count)
             return articles
             
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # 读取响应过程中的网络错误交由调用方重试
+            raise
         except Exception as e:
-            print(f"ISSN/EISSN信息XML解析错误: {e}")
-            self.performance_stats['errors'] += 1
+            print(f"{error_label}: {e}")
+            self._count_stat('errors')
             return []
     
-    def _extract_issn_info(self, article_element) -> Optional[Dict]:
+    def _parse_xml_response_optimized(self, xml_content) -> List[Dict]:
         """
-        从XML元素中提取ISSN和EISSN信息
+        优化的XML响应解析方法，使用lxml增量解析
         
         Args:
-            article_element: XML文章元素
+            xml_content: XML内容（bytes或str），或字节块迭代器
+        
+        Returns:
+            文章信息列表
+        """
+        return self._parse_articles(xml_content, self._extract_article_info, "XML解析错误")
+    
+    def _parse_xml_response_issn_only(self, xml_content) -> List[Dict]:
+        """
+        只解析ISSN和EISSN信息的esummary响应（DocSum格式）
+        
+        Args:
+            xml_content: XML内容（bytes或str），或字节块迭代器
+        
+        Returns:
+            只包含PMID、ISSN、EISSN的文章信息列表
+        """
+        return self._parse_articles(xml_content, self._extract_issn_info, "ISSN/EISSN信息XML解析错误", tag='DocSum')
+    
+    def _extract_issn_info(self, docsum_element) -> Optional[Dict]:
+        """
+        从DocSum元素中提取ISSN和EISSN信息
+        
+        Args:
+            docsum_element: esummary返回的DocSum元素
         
         Returns:
             包含PMID、ISSN、EISSN的文章信息字典
         """
-        try:
-            # 基本信息
-            pmid_elem = article_element.find('.//PMID')
-            pmid = pmid_elem.text if pmid_elem is not None else ""
-            
-            # ISSN和eISSN
-            issn, eissn = self._extract_issn(article_element)
-            
-            return {
-                'pmid': pmid,
-                'issn': issn,
-                'eissn': eissn,
-            }
-            
-        except Exception as e:
-            print(f"提取ISSN/EISSN信息失败: {e}")
-            return None
+        # 基本信息
+        pmid = self._XP_DOCSUM_ID(docsum_element)
+        
+        # ISSN为印刷版，ESSN为电子版；没有印刷版时与完整XML路径一致，用任意ISSN作为备用
+        eissn = sys.intern(self._XP_DOCSUM_ESSN(docsum_element))
+        issn = sys.intern(self._XP_DOCSUM_ISSN(docsum_element)) or eissn
+        
+        return {
+            'pmid': pmid,
+            'issn': issn,
+            'eissn': eissn,
+        }
     
     def _extract_article_info(self, article_element) -> Optional[Dict]:
         """
@@ -670,76 +1244,64 @@ class PubMedSearcher:
         Returns:
             文章信息字典
         """
-        try:
-            # 基本信息
-            pmid_elem = article_element.find('.//PMID')
-            pmid = pmid_elem.text if pmid_elem is not None else ""
-            
-            title_elem = article_element.find('.//ArticleTitle')
-            title = title_elem.text if title_elem is not None else ""
-            
-            # 作者信息
-            authors = []
-            for author in article_element.findall('.//Author'):
-                last_name = author.find('LastName')
-                fore_name = author.find('ForeName')
-                if last_name is not None and fore_name is not None:
-                    authors.append(f"{last_name.text}, {fore_name.text}")
-                elif last_name is not None:
-                    authors.append(last_name.text)
-            
-            # 期刊信息
-            journal_elem = article_element.find('.//Journal/Title')
-            journal = journal_elem.text if journal_elem is not None else ""
-            
-            # 期刊卷期页码信息
-            volume, issue, pages = self._extract_journal_info(article_element)
-            
-            # 发表日期
-            pub_date = self._extract_publication_date(article_element)
-            
-            # 摘要 - 支持多段落完整摘要
-            abstract = self._extract_complete_abstract(article_element)
-            
-            # ISSN和eISSN
-            issn, eissn = self._extract_issn(article_element)
-            
-            # DOI
-            doi = ""
-            for article_id in article_element.findall('.//ArticleId'):
-                id_type = article_id.get('IdType')
-                if id_type == 'doi':
-                    doi = article_id.text
-                    break
-            
-            # 关键词
-            keywords = []
-            for keyword in article_element.findall('.//Keyword'):
-                if keyword.text:
-                    keywords.append(keyword.text)
-            
-            return {
-                'pmid': pmid,
-                'title': title,
-                'authors': authors,
-                'journal': journal,
-                'volume': volume,
-                'issue': issue,
-                'pages': pages,
-                'publication_date': pub_date,
-                'abstract': abstract,
-                'doi': doi,
-                'issn': issn,
-                'eissn': eissn,
-                'keywords': keywords,
-                'authors_str': '; '.join(authors),
-                'keywords_str': '; '.join(keywords),
-                'url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}" if pmid else ""  # 构建PubMed URL
-            }
-            
-        except Exception as e:
-            print(f"提取文章信息失败: {e}")
-            return None
+        # 基本信息
+        pmid = self._XP_PMID(article_element)
+        
+        # string()包含标题中<i>、<sup>等子元素的文本
+        title = self._XP_TITLE(article_element)
+        
+        # 作者信息
+        authors = []
+        for author in article_element.iter('Author'):
+            last_name = author.findtext('LastName')
+            if not last_name:
+                continue
+            fore_name = author.findtext('ForeName')
+            authors.append(f"{last_name}, {fore_name}" if fore_name else last_name)
+        
+        # 期刊信息（同一期刊在结果中大量重复，驻留后共享同一字符串对象）
+        journal = sys.intern(self._XP_JOURNAL(article_element))
+        
+        # 期刊卷期页码信息
+        volume, issue, pages = self._extract_journal_info(article_element)
+        
+        # 发表日期
+        pub_date = self._extract_publication_date(article_element)
+        
+        # 摘要 - 支持多段落完整摘要
+        abstract = self._extract_complete_abstract(article_element)
+        
+        # ISSN和eISSN
+        issn, eissn = self._extract_issn(article_element)
+        
+        # DOI（文档顺序中第一个，即文章自身的ArticleIdList，而非参考文献中的）
+        doi = next(
+            (article_id.text or "" for article_id in article_element.iter('ArticleId')
+             if article_id.get('IdType') == 'doi'),
+            ""
+        )
+        
+        # 关键词
+        keywords = [keyword.text for keyword in article_element.iter('Keyword') if keyword.text]
+        
+        return {
+            'pmid': pmid,
+            'title': title,
+            'authors': authors,
+            'journal': journal,
+            'volume': volume,
+            'issue': issue,
+            'pages': pages,
+            'publication_date': pub_date,
+            'abstract': abstract,
+            'doi': doi,
+            'issn': issn,
+            'eissn': eissn,
+            'keywords': keywords,
+            'authors_str': '; '.join(authors),
+            'keywords_str': '; '.join(keywords),
+            'url': f"https://pubmed.ncbi.nlm.nih.gov/{pmid}" if pmid else ""  # 构建PubMed URL
+        }
     
     def _extract_journal_info(self, article_element) -> tuple:
         """
@@ -751,66 +1313,36 @@ class PubMedSearcher:
         Returns:
             (volume, issue, pages) 元组
         """
-        volume = ""
-        issue = ""
-        pages = ""
+        # JournalIssue下的Volume和Issue
+        volume = self._XP_VOLUME(article_element)
+        issue = self._XP_ISSUE(article_element)
         
-        try:
-            # 查找JournalIssue下的Volume
-            volume_elem = article_element.find('.//JournalIssue/Volume')
-            if volume_elem is not None:
-                volume = volume_elem.text or ""
-            
-            # 查找JournalIssue下的Issue
-            issue_elem = article_element.find('.//JournalIssue/Issue')
-            if issue_elem is not None:
-                issue = issue_elem.text or ""
-            
-            # 查找Pagination下的MedlinePgn
-            pages_elem = article_element.find('.//Pagination/MedlinePgn')
-            if pages_elem is not None:
-                pages = pages_elem.text or ""
-            
-            # 备用方案：查找StartPage和EndPage
-            if not pages:
-                start_page = article_element.find('.//Pagination/StartPage')
-                end_page = article_element.find('.//Pagination/EndPage')
-                
-                if start_page is not None and end_page is not None:
-                    pages = f"{start_page.text}-{end_page.text}"
-                elif start_page is not None:
-                    pages = start_page.text or ""
-                    
-        except Exception as e:
-            # 静默处理异常
-            pass
+        # 查找Pagination下的MedlinePgn
+        pages = self._XP_MEDLINE_PGN(article_element)
+        
+        # 备用方案：查找StartPage和EndPage
+        if not pages:
+            start_page = self._XP_START_PAGE(article_element)
+            end_page = self._XP_END_PAGE(article_element)
             
+            if start_page and end_page:
+                pages = f"{start_page[0].text or ''}-{end_page[0].text or ''}"
+            elif start_page:
+                pages = start_page[0].text or ""
+        
         return volume, issue, pages
     
     def _extract_publication_date(self, article_element) -> str:
         """提取发表日期"""
-        try:
-            # 尝试获取完整日期
-            date_elem = article_element.find('.//PubDate')
-            if date_elem is not None:
-                year = date_elem.find('Year')
-                month = date_elem.find('Month')
-                day = date_elem.find('Day')
-                
-                date_parts = []
-                if year is not None:
-                    date_parts.append(year.text)
-                if month is not None:
-                    date_parts.append(month.text)
-                if day is not None:
-                    date_parts.append(day.text)
-                
-                return '-'.join(date_parts) if date_parts else ""
-            
-            return ""
-            
-        except Exception:
+        # 尝试获取完整日期
+        date_elem = article_element.find('.//PubDate')
+        if date_elem is None:
             return ""
+        
+        date_parts = [
+            date_elem.findtext(part) for part in ('Year', 'Month', 'Day')
+        ]
+        return '-'.join(part for part in date_parts if part)
     
     def _extract_issn(self, article_element) -> tuple:
         """
@@ -825,25 +1357,20 @@ class PubMedSearcher:
         issn = ""
         eissn = ""
         
-        try:
-            # 查找Journal下的ISSN信息
-            for issn_elem in article_element.findall('.//Journal/ISSN'):
-                issn_type = issn_elem.get('IssnType')
-                if issn_type == 'Print' and not issn:
-                    issn = issn_elem.text or ""
-                elif issn_type == 'Electronic' and not eissn:
-                    eissn = issn_elem.text or ""
-            
-            # 如果没有找到Print ISSN，尝试获取任意ISSN作为备用
-            if not issn:
-                issn_elem = article_element.find('.//Journal/ISSN')
-                if issn_elem is not None:
-                    issn = issn_elem.text or ""
-                    
-        except Exception as e:
-            pass
-            
-        return issn, eissn
+        # 查找Journal下的ISSN信息
+        issn_elems = self._XP_ISSN(article_element)
+        for issn_elem in issn_elems:
+            issn_type = issn_elem.get('IssnType')
+            if issn_type == 'Print' and not issn:
+                issn = issn_elem.text or ""
+            elif issn_type == 'Electronic' and not eissn:
+                eissn = issn_elem.text or ""
+        
+        # 如果没有找到Print ISSN，尝试获取任意ISSN作为备用
+        if not issn and issn_elems:
+            issn = issn_elems[0].text or ""
+        
+        return sys.intern(issn), sys.intern(eissn)
     
     def _extract_complete_abstract(self, article_element) -> str:
         """
@@ -855,50 +1382,172 @@ class PubMedSearcher:
         Returns:
             完整的摘要文本
         """
+        abstract_parts = []
+        
+        # 查找所有AbstractText元素
+        abstract_texts = self._XP_ABSTRACT_TEXTS(article_element)
+        
+        # 常见情况：单段无标签摘要，直接返回文本
+        if len(abstract_texts) == 1 and not abstract_texts[0].get('Label'):
+            text = (abstract_texts[0].text or "").strip()
+            if text:
+                return text
+        
+        for abstract_elem in abstract_texts:
+            # 获取标签（如Background, Methods, Results等）
+            label = abstract_elem.get('Label')
+            text = (abstract_elem.text or "").strip()
+            
+            if text:
+                if label:
+                    abstract_parts.append(f"{label}: {text}")
+                else:
+                    abstract_parts.append(text)
+        
+        # 合并所有段落
+        if abstract_parts:
+            return " ".join(abstract_parts)
+        
+        # 备用方案：取Abstract元素的全部文本内容（如AbstractText内只有子标签）。
+        # 第一个AbstractText通常就挂在Abstract下，直接取父节点，避免再扫描一遍子树
+        abstract_elem = abstract_texts[0].getparent() if abstract_texts else None
+        if abstract_elem is None or abstract_elem.tag != 'Abstract':
+            abstract_elem = article_element.find('.//Abstract')
+        if abstract_elem is not None:
+            # tostring(method='text')在C层拼接全部文本，比itertext逐个生成再join快
+            return lxml_etree.tostring(
+                abstract_elem, method='text', encoding='unicode', with_tail=False
+            ).strip()
+        
+        return ""
+
+    
+    def get_performance_report(self) -> Dict:
+        """获取性能报告"""
+        stats = self.performance_stats
+        total_searches = stats['total_searches']
+        articles_parsed = stats['articles_parsed']
+        searches_divisor = max(total_searches, 1)
+        return {
+            'total_searches': total_searches,
+            'cache_hits': stats['cache_hits'],
+            'cache_hit_rate': stats['cache_hits'] / searches_divisor,
+            'api_calls': stats['api_calls'],
+            'retries': stats['retries'],
+            'errors': stats['errors'],
+            'total_latency': stats['total_latency'],
+            'average_latency': stats['total_latency'] / searches_divisor,
+            'parse_time': stats['parse_time'],
+            'articles_parsed': articles_parsed,
+            'average_parse_time': stats['parse_time'] / articles_parsed if articles_parsed > 0 else 0
+        }
+    
+    def print_performance_report(self):
+        """打印性能报告"""
+        report = self.get_performance_report()
+        print("\n=== PubMed检索器性能报告 ===")
+        print(f"总搜索次数: {report['total_searches']}")
+        print(f"缓存命中率: {report['cache_hit_rate']:.2%}")
+        print(f"API调用次数: {report['api_calls']}")
+        print(f"重试次数: {report['retries']}")
+        print(f"错误次数: {report['errors']}")
+        print(f"平均延迟: {report['average_latency']:.2f}秒")
+        print(f"平均解析时间: {report['average_parse_time']:.4f}秒")
+        print(f"解析文章总数: {report['articles_parsed']}")
+        print("=" * 30)
+    
+    def cleanup(self):
+        """清理资源"""
         try:
-            abstract_parts = []
+            # 清理会话
+            if hasattr(self, 'session'):
+                self.session.close()
             
-            # 查找所有AbstractText元素
-            abstract_texts = article_element.findall('.//AbstractText')
+            # 关闭缓存索引
+            if self.cache:
+                self.cache.close()
+            if self.article_cache:
+                self.article_cache.close()
             
-            if abstract_texts:
-                for abstract_elem in abstract_texts:
-                    # 获取标签（如Background, Methods, Results等）
-                    label = abstract_elem.get('Label')
-                    text = abstract_elem.text or ""
-                    
-                    if text.strip():
-                        if label:
-                            abstract_parts.append(f"{label}: {text.strip()}")
-                        else:
-                            abstract_parts.append(text.strip())
+            # 打印性能报告
+            if self.performance_stats['total_searches'] > 0:
+                self.print_performance_report()
                 
-                # 合并所有段落
-                if abstract_parts:
-                    return " ".join(abstract_parts)
-            
-            # 备用方案：查找Abstract元素
-            abstract_elem = article_element.find('.//Abstract')
-            if abstract_elem is not None:
-                # 获取所有文本内容
-                abstract_text = "".join(abstract_elem.itertext()).strip()
-                if abstract_text:
-                    return abstract_text
-                    
-            return ""
-            
         except Exception as e:
-            # 备用方案：使用简单方式提取
-            try:
-                abstract_elem = article_element.find('.//AbstractText')
-                return abstract_elem.text if abstract_elem is not None else ""
-            except:
-                return ""
+            print(f"清理资源时出错: {e}")
+
+
+# 导出用到的字段及缺省值，导出前一次性补齐，之后用itemgetter按元组批量取值
+_EXPORT_DEFAULTS = dict.fromkeys((
+    'pmid', 'title', 'authors_str', 'journal', 'volume', 'issue', 'pages',
+    'publication_date', 'abstract', 'doi', 'issn', 'eissn', 'keywords_str'
+), '')
+_EXPORT_DEFAULTS['authors'] = []
+
+# TXT/BibTeX导出每累积这么多篇文章合并写入一次，减少write调用次数并限制内存占用
+_EXPORT_FLUSH_EVERY = 1000
+
+# CSV导出的列
+_CSV_FIELDNAMES = (
+    'pmid', 'title', 'authors_str', 'journal', 'volume', 'issue', 'pages',
+    'publication_date', 'abstract', 'doi', 'issn', 'eissn', 'keywords_str'
+)
+_CSV_ROW = itemgetter(*_CSV_FIELDNAMES)
+# 标题、摘要中的换行替换为空格，使每篇文章在CSV中只占一行
+_CSV_NEWLINE_TO_SPACE = str.maketrans('\r\n', '  ')
+_CSV_TITLE_INDEX = _CSV_FIELDNAMES.index('title')
+_CSV_ABSTRACT_INDEX = _CSV_FIELDNAMES.index('abstract')
+
+
+def _csv_rows(articles: List[Dict]):
+    """按CSV列顺序生成每篇文章的行；只有含换行的行才复制并清理"""
+    for row in map(_CSV_ROW, articles):
+        title = row[_CSV_TITLE_INDEX]
+        abstract = row[_CSV_ABSTRACT_INDEX]
+        if '\n' in abstract or '\r' in abstract or '\n' in title or '\r' in title:
+            row = list(row)
+            row[_CSV_TITLE_INDEX] = title.translate(_CSV_NEWLINE_TO_SPACE)
+            row[_CSV_ABSTRACT_INDEX] = abstract.translate(_CSV_NEWLINE_TO_SPACE)
+        yield row
+
+_TXT_FIELDS = itemgetter(
+    'pmid', 'title', 'authors_str', 'journal', 'volume', 'issue', 'pages',
+    'publication_date', 'doi', 'issn', 'eissn', 'keywords_str', 'abstract'
+)
+
+def _bibtex_year(pub_date: str) -> str:
+    """取发表日期中第一个'-'之前的年份部分，不分配中间列表"""
+    dash = pub_date.find('-')
+    return pub_date if dash < 0 else pub_date[:dash]
+
+
+_BIBTEX_FIELDS = itemgetter(
+    'pmid', 'title', 'authors', 'journal', 'publication_date', 'volume', 'issue',
+    'pages', 'doi', 'issn', 'eissn'
+)
+
+# BibTeX标题中去除花括号（单次translate代替两次replace）
+_BIBTEX_BRACE_STRIP = str.maketrans('', '', '{}')
 
 
 class DataExporter:
     """数据导出类"""
     
+    @staticmethod
+    def _open_for_write(filename: str, newline: Optional[str] = None):
+        """以1MB缓冲打开UTF-8文本文件，把大量小块write合并为少量系统调用"""
+        return io.TextIOWrapper(
+            open(filename, 'wb', buffering=1 << 20), encoding='utf-8', newline=newline
+        )
+    
+    @staticmethod
+    def _normalize(articles: List[Dict]) -> List[Dict]:
+        """补齐导出字段的缺省值；字段齐全的文章直接复用，不复制"""
+        return [
+            article if article.keys() >= _EXPORT_DEFAULTS.keys() else {**_EXPORT_DEFAULTS, **article}
+            for article in articles
+        ]
+    
     @staticmethod
     def export_to_csv(articles: List[Dict], filename: str) -> bool:
         """导出为CSV格式"""
@@ -906,19 +1555,15 @@ class DataExporter:
             print("没有文章数据可导出")
             return False
         
+        # csv只有这里用到，用时再导入
+        import csv
+        
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = [
-                    'pmid', 'title', 'authors_str', 'journal', 'volume', 'issue', 'pages',
-                    'publication_date', 'abstract', 'doi', 'issn', 'eissn', 'keywords_str'
-                ]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for article in articles:
-                    # 只写入指定字段
-                    row = {field: article.get(field, '') for field in fieldnames}
-                    writer.writerow(row)
+            with DataExporter._open_for_write(filename, newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(_CSV_FIELDNAMES)
+                # 只写入指定字段，按列顺序生成元组交给C层writer
+                writer.writerows(_csv_rows(DataExporter._normalize(articles)))
             
             print(f"已导出CSV文件: {filename}")
             return True
@@ -928,19 +1573,36 @@ class DataExporter:
             return False
     
     @staticmethod
-    def export_to_json(articles: List[Dict], filename: str) -> bool:
-        """导出为JSON格式"""
+    def _dump_indented(obj: Any) -> bytes:
+        """以2空格缩进编码为UTF-8字节，优先使用orjson"""
+        if HAS_ORJSON:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    @staticmethod
+    def export_to_json(articles: List[Dict], filename: str,
+                       export_ts: Optional[datetime] = None) -> bool:
+        """导出为JSON格式；export_ts为导出时间，不传则取当前时间"""
         if not articles:
             print("没有文章数据可导出")
             return False
         
         try:
-            with open(filename, 'w', encoding='utf-8') as jsonfile:
-                json.dump({
-                    'search_date': datetime.now().isoformat(),
-                    'total_articles': len(articles),
-                    'articles': articles
-                }, jsonfile, ensure_ascii=False, indent=2)
+            # 逐篇编码写入缓冲区，内存中只保留单篇文章的编码结果；
+            # 输出格式与整体indent=2序列化完全一致
+            search_date = (export_ts or datetime.now()).isoformat()
+            with open(filename, 'wb', buffering=1 << 20) as jsonfile:
+                jsonfile.write(
+                    b'{\n  "search_date": ' + _json_dumps(search_date) +
+                    b',\n  "total_articles": ' + str(len(articles)).encode('ascii') +
+                    b',\n  "articles": [\n'
+                )
+                for i, article in enumerate(articles):
+                    if i:
+                        jsonfile.write(b',\n')
+                    # 文章位于第二层嵌套，每行再缩进4个空格
+                    jsonfile.write(b'    ' + DataExporter._dump_indented(article).replace(b'\n', b'\n    '))
+                jsonfile.write(b'\n  ]\n}')
             
             print(f"已导出JSON文件: {filename}")
             return True
@@ -950,40 +1612,58 @@ class DataExporter:
             return False
     
     @staticmethod
-    def export_to_txt(articles: List[Dict], filename: str) -> bool:
-        """导出为TXT格式"""
+    def export_to_txt(articles: List[Dict], filename: str,
+                      export_ts: Optional[datetime] = None) -> bool:
+        """导出为TXT格式；export_ts为导出时间，不传则取当前时间"""
         if not articles:
             print("没有文章数据可导出")
             return False
         
         try:
-            with open(filename, 'w', encoding='utf-8') as txtfile:
-                txtfile.write(f"PubMed搜索结果\n")
-                txtfile.write(f"导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                txtfile.write(f"文章数量: {len(articles)}\n")
-                txtfile.write("=" * 80 + "\n\n")
+            with DataExporter._open_for_write(filename) as txtfile:
+                # 文件头拼成一个字符串一次写入
+                txtfile.write(
+                    f"PubMed搜索结果\n"
+                    f"导出时间: {(export_ts or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"文章数量: {len(articles)}\n"
+                    f"{'=' * 80}\n\n"
+                )
                 
-                for i, article in enumerate(articles, 1):
-                    txtfile.write(f"[{i}] PMID: {article.get('pmid', '')}\n")
-                    txtfile.write(f"标题: {article.get('title', '')}\n")
-                    txtfile.write(f"作者: {article.get('authors_str', '')}\n")
-                    txtfile.write(f"期刊: {article.get('journal', '')}\n")
-                    if article.get('volume'):
-                        txtfile.write(f"卷: {article.get('volume', '')}\n")
-                    if article.get('issue'):
-                        txtfile.write(f"期: {article.get('issue', '')}\n")
-                    if article.get('pages'):
-                        txtfile.write(f"页码: {article.get('pages', '')}\n")
-                    txtfile.write(f"发表日期: {article.get('publication_date', '')}\n")
-                    txtfile.write(f"DOI: {article.get('doi', '')}\n")
-                    txtfile.write(f"ISSN: {article.get('issn', '')}\n")
-                    txtfile.write(f"eISSN: {article.get('eissn', '')}\n")
-                    txtfile.write(f"关键词: {article.get('keywords_str', '')}\n")
+                # 已拼好的文章文本，每_EXPORT_FLUSH_EVERY篇合并写入一次
+                pending = []
+                for i, article in enumerate(DataExporter._normalize(articles), 1):
+                    (pmid, title, authors_str, journal, volume, issue, pages,
+                     pub_date, doi, issn, eissn, keywords_str, abstract) = _TXT_FIELDS(article)
                     
-                    if article.get('abstract'):
-                        txtfile.write(f"摘要: {article['abstract']}\n")
+                    # 每篇文章的各行先拼好，一次写入
+                    parts = [
+                        f"[{i}] PMID: {pmid}\n",
+                        f"标题: {title}\n",
+                        f"作者: {authors_str}\n",
+                        f"期刊: {journal}\n",
+                    ]
+                    if volume:
+                        parts.append(f"卷: {volume}\n")
+                    if issue:
+                        parts.append(f"期: {issue}\n")
+                    if pages:
+                        parts.append(f"页码: {pages}\n")
+                    parts.append(f"发表日期: {pub_date}\n")
+                    parts.append(f"DOI: {doi}\n")
+                    parts.append(f"ISSN: {issn}\n")
+                    parts.append(f"eISSN: {eissn}\n")
+                    parts.append(f"关键词: {keywords_str}\n")
+                    
+                    if abstract:
+                        parts.append(f"摘要: {abstract}\n")
                     
-                    txtfile.write("-" * 80 + "\n\n")
+                    parts.append("-" * 80 + "\n\n")
+                    pending.append("".join(parts))
+                    if len(pending) >= _EXPORT_FLUSH_EVERY:
+                        txtfile.write("".join(pending))
+                        pending.clear()
+                
+                txtfile.write("".join(pending))
             
             print(f"已导出TXT文件: {filename}")
             return True
@@ -1000,45 +1680,44 @@ class DataExporter:
             return False
         
         try:
-            with open(filename, 'w', encoding='utf-8') as bibfile:
-                for article in articles:
-                    pmid = article.get('pmid', '')
-                    title = article.get('title', '').replace('{', '').replace('}', '')
-                    authors = ' and '.join(article.get('authors', []))
-                    journal = article.get('journal', '')
-                    year = article.get('publication_date', '').split('-')[0] if article.get('publication_date') else ''
-                    volume = article.get('volume', '')
-                    issue = article.get('issue', '') 
-                    pages = article.get('pages', '')
-                    doi = article.get('doi', '')
+            with DataExporter._open_for_write(filename) as bibfile:
+                # 已拼好的条目，每_EXPORT_FLUSH_EVERY条合并写入一次
+                pending = []
+                for article in DataExporter._normalize(articles):
+                    (pmid, title, authors, journal, pub_date, volume, issue,
+                     pages, doi, issn, eissn) = _BIBTEX_FIELDS(article)
+                    title = title.translate(_BIBTEX_BRACE_STRIP)
+                    authors = ' and '.join(authors)
+                    year = _bibtex_year(pub_date)
                     
-                    bibfile.write(f"@article{{pmid{pmid},\n")
-                    bibfile.write(f"  title={{{title}}},\n")
+                    # 整条记录拼好后一次写入，空字段不输出
+                    lines = [f"@article{{pmid{pmid},", f"  title={{{title}}},"]
                     if authors:
-                        bibfile.write(f"  author={{{authors}}},\n")
+                        lines.append(f"  author={{{authors}}},")
                     if journal:
-                        bibfile.write(f"  journal={{{journal}}},\n")
+                        lines.append(f"  journal={{{journal}}},")
                     if volume:
-                        bibfile.write(f"  volume={{{volume}}},\n")
+                        lines.append(f"  volume={{{volume}}},")
                     if issue:
-                        bibfile.write(f"  number={{{issue}}},\n")
+                        lines.append(f"  number={{{issue}}},")
                     if pages:
-                        bibfile.write(f"  pages={{{pages}}},\n")
+                        lines.append(f"  pages={{{pages}}},")
                     if year:
-                        bibfile.write(f"  year={{{year}}},\n")
+                        lines.append(f"  year={{{year}}},")
                     if doi:
-                        bibfile.write(f"  doi={{{doi}}},\n")
-                    
-                    issn = article.get('issn', '')
+                        lines.append(f"  doi={{{doi}}},")
                     if issn:
-                        bibfile.write(f"  issn={{{issn}}},\n")
-                    
-                    eissn = article.get('eissn', '')
+                        lines.append(f"  issn={{{issn}}},")
                     if eissn:
-                        bibfile.write(f"  eissn={{{eissn}}},\n")
-                    
-                    bibfile.write(f"  pmid={{{pmid}}}\n")
-                    bibfile.write("}\n\n")
+                        lines.append(f"  eissn={{{eissn}}},")
+                    lines.append(f"  pmid={{{pmid}}}")
+                    lines.append("}\n\n")
+                    pending.append("\n".join(lines))
+                    if len(pending) >= _EXPORT_FLUSH_EVERY:
+                        bibfile.write("".join(pending))
+                        pending.clear()
+                
+                bibfile.write("".join(pending))
             
             print(f"已导出BibTeX文件: {filename}")
             return True
@@ -1046,10 +1725,56 @@ class DataExporter:
         except Exception as e:
             print(f"导出BibTeX失败: {e}")
             return False
+    
+    @staticmethod
+    def _export_jobs(articles: List[Dict], formats: List[str], output_prefix: str,
+                     export_ts: Optional[datetime] = None) -> List[Tuple[Any, List[Dict], str]]:
+        """为每个格式生成(导出函数, 文章列表, 文件名)"""
+        export_ts = export_ts or datetime.now()
+        # 补齐缺省字段只做一次，各文本格式导出器内部的_normalize对齐全的文章直接复用；
+        # JSON导出保持原始文章内容
+        normalized = DataExporter._normalize(articles)
+        exporters = {
+            'csv': DataExporter.export_to_csv,
+            'json': partial(DataExporter.export_to_json, export_ts=export_ts),
+            'txt': partial(DataExporter.export_to_txt, export_ts=export_ts),
+            'bibtex': DataExporter.export_to_bibtex,
+        }
+        return [
+            (exporters[fmt], articles if fmt == 'json' else normalized, f"{output_prefix}.{fmt}")
+            for fmt in formats
+        ]
+    
+    @staticmethod
+    def export_formats(articles: List[Dict], formats: List[str], output_prefix: str,
+                       export_ts: Optional[datetime] = None) -> bool:
+        """
+        导出为多种格式，各格式写入不同文件、互不依赖，在线程池中并行导出
+        
+        Returns:
+            是否至少有一种格式导出成功
+        """
+        jobs = DataExporter._export_jobs(articles, formats, output_prefix, export_ts)
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(func, data, filename) for func, data, filename in jobs]
+            return any([future.result() for future in futures])
+    
+    @staticmethod
+    async def export_formats_async(articles: List[Dict], formats: List[str], output_prefix: str,
+                                   export_ts: Optional[datetime] = None) -> bool:
+        """export_formats的异步版本，各格式在线程中并发写入，不阻塞事件循环"""
+        jobs = DataExporter._export_jobs(articles, formats, output_prefix, export_ts)
+        results = await asyncio.gather(
+            *(_run_in_thread(func, data, filename) for func, data, filename in jobs)
+        )
+        return any(results)
 
 
 def main():
     """主程序入口"""
+    # argparse只有命令行入口用到，放到这里导入，作为库导入本模块时不加载
+    import argparse
+    
     parser = argparse.ArgumentParser(description='PubMed文献搜索和导出工具')
     parser.add_argument('query', help='搜索关键词')
     parser.add_argument('-n', '--max-results', type=int, default=50, 
@@ -1065,7 +1790,7 @@ def main():
     args = parser.parse_args()
     
     # 创建搜索器
-    searcher = PubMedSearcher(email=args.email)
+    searcher = PubMedSearcher(SearchConfig(email=args.email))
     
     # 搜索文章
     pmids = searcher.search_articles(
@@ -1086,29 +1811,18 @@ def main():
         sys.exit(1)
     
     # 生成输出文件名
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # 导出时间只取一次，文件名和各格式的导出时间共用
+    export_ts = datetime.now()
+    timestamp = export_ts.strftime('%Y%m%d_%H%M%S')
     output_prefix = args.output or f"pubmed_search_{timestamp}"
     
     # 导出数据
-    exporter = DataExporter()
-    success = False
-    
     if args.format == 'all':
         formats = ['csv', 'json', 'txt', 'bibtex']
     else:
         formats = [args.format]
     
-    for fmt in formats:
-        filename = f"{output_prefix}.{fmt}"
-        
-        if fmt == 'csv':
-            success = exporter.export_to_csv(articles, filename) or success
-        elif fmt == 'json':
-            success = exporter.export_to_json(articles, filename) or success
-        elif fmt == 'txt':
-            success = exporter.export_to_txt(articles, filename) or success
-        elif fmt == 'bibtex':
-            success = exporter.export_to_bibtex(articles, filename) or success
+    success = DataExporter.export_formats(articles, formats, output_prefix, export_ts)
     
     if success:
         print(f"\n搜索完成! 共处理 {len(articles)} 篇文章")
@@ -1117,54 +1831,5 @@ def main():
         sys.exit(1)
 
 
-    def get_performance_report(self) -> Dict:
-        """获取性能报告"""
-        return {
-            'total_searches': self.performance_stats['total_searches'],
-            'cache_hits': self.performance_stats['cache_hits'],
-            'cache_hit_rate': self.performance_stats['cache_hits'] / max(self.performance_stats['total_searches'], 1),
-            'api_calls': self.performance_stats['api_calls'],
-            'retries': self.performance_stats['retries'],
-            'errors': self.performance_stats['errors'],
-            'total_latency': self.performance_stats['total_latency'],
-            'average_latency': self.performance_stats['total_latency'] / max(self.performance_stats['total_searches'], 1),
-            'parse_time': self.performance_stats['parse_time'],
-            'articles_parsed': self.performance_stats['articles_parsed'],
-            'average_parse_time': self.performance_stats['parse_time'] / max(self.performance_stats['articles_parsed'], 1) if self.performance_stats['articles_parsed'] > 0 else 0
-        }
-    
-    def print_performance_report(self):
-        """打印性能报告"""
-        report = self.get_performance_report()
-        print("\n=== PubMed检索器性能报告 ===")
-        print(f"总搜索次数: {report['total_searches']}")
-        print(f"缓存命中率: {report['cache_hit_rate']:.2%}")
-        print(f"API调用次数: {report['api_calls']}")
-        print(f"重试次数: {report['retries']}")
-        print(f"错误次数: {report['errors']}")
-        print(f"平均延迟: {report['average_latency']:.2f}秒")
-        print(f"平均解析时间: {report['average_parse_time']:.4f}秒")
-        print(f"解析文章总数: {report['articles_parsed']}")
-        print("=" * 30)
-    
-    def cleanup(self):
-        """清理资源"""
-        try:
-            # 清理会话
-            if hasattr(self, 'session'):
-                self.session.close()
-            
-            # 清理缓存
-            if hasattr(self, 'cache'):
-                self.cache.cleanup()
-            
-            # 打印性能报告
-            if self.performance_stats['total_searches'] > 0:
-                self.print_performance_report()
-                
-        except Exception as e:
-            print(f"清理资源时出错: {e}")
-
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -11,23 +11,66 @@ import re
 import time
 import threading
 import hashlib
+import logging
 from typing import Dict, List, Optional, Tuple
-from collections import Counter, defaultdict
-from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, OrderedDict, defaultdict
 from ai_client import AIClient, ConfigManager, ChatMessage
 from prompts_manager import PromptsManager
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# 摘要、标题清理用的预编译正则
+_WHITESPACE = re.compile(r'\s+')
+_TEXT_BAD_CHARS = re.compile(r'[^\w\s\u4e00-\u9fff.,;:!?()-]')
+# 同一规则下ASCII范围内要删除的字符，纯ASCII文本用translate删除，比正则快数倍
+_ASCII_BAD_CHARS = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if _TEXT_BAD_CHARS.match(c)
+))
+
+
+def _strip_bad_chars(text: str) -> str:
+    """移除特殊字符；纯ASCII文本走translate，含非ASCII字符时仍用正则"""
+    if text.isascii():
+        return text.translate(_ASCII_BAD_CHARS)
+    return _TEXT_BAD_CHARS.sub('', text)
+
+# 可能的摘要字段名（按优先级排序）
+_ABSTRACT_FIELDS = ('摘要', 'abstract', 'Abstract', 'summary', 'Summary', 'description', 'Description')
+
+# AI回复中的引导语片段（“好的，作为”已被“作为”覆盖）
+_INTRO_PATTERNS = ('作为', '根据您提供的', '基于您提供的', '我已对您提供的', '我将为您',
+                   '以下是', '现在我为您', '基于以上', '根据以上')
+
+# 大纲开始的行：以#、"- "、"1."、"一、"、"二、"开头（忽略行首空白），
+# 或不含引导语、但含"##"、"字"、"引言"、"结论"的行
+_OUTLINE_START = re.compile(
+    r'^[^\S\n]*(?:#|- (?=[^\n]*\S)|1\.|一、|二、)'
+    r'|^(?![^\n]*(?:' + '|'.join(map(re.escape, _INTRO_PATTERNS)) + r'))'
+    r'(?=[^\n]*(?:##|字|引言|结论))',
+    re.MULTILINE
+)
+
+# 大纲必须包含其一的章节
+_REQUIRED_SECTIONS = ('引言', '结论', '总结')
+
+# 摘要评分用的关键词（已为小写）
+_SCORE_KEYWORDS = ('study', 'research', 'analysis', 'results', 'conclusion', 'findings',
+                   '研究', '分析', '结果', '结论', '发现')
+
 
 class OutlineGeneratorConfig:
     """大纲生成器配置类"""
     def __init__(self):
-        self.max_workers = 4  # 最大工作线程数
         self.cache_size = 500  # 缓存大小
         self.cache_ttl = 7200  # 缓存有效期（秒）- 2小时
         # self.max_abstracts = 100  # 移除固定限制，根据输入处理
-        self.batch_size = 50  # 批处理大小
-        self.enable_parallel = True  # 启用并行处理
         self.enable_caching = True  # 启用缓存
         self.retry_attempts = 3  # 重试次数
         self.memory_limit_mb = 300  # 内存限制（MB）
@@ -37,64 +80,68 @@ class OutlineCache:
     """大纲生成结果缓存管理器"""
     def __init__(self, config: OutlineGeneratorConfig):
         self.config = config
-        self.cache = {}
-        self.access_times = {}
+        # key -> (大纲, 写入时间)；按最近访问顺序排列，最久未访问的在最前，淘汰为O(1)。
+        # 写入时间取单调时钟，系统时间被调整时TTL判断不受影响
+        self.cache = OrderedDict()
         self.lock = threading.Lock()
         self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
     
-    def _generate_key(self, abstracts_hash: str, research_topic: str) -> str:
-        """生成缓存键"""
-        content = f"{abstracts_hash}:{research_topic}"
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
-    
-    def _hash_abstracts(self, abstracts: List[str]) -> str:
-        """生成摘要列表的哈希值"""
-        content = "|".join(sorted(abstracts))
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
-    
-    def get(self, abstracts: List[str], research_topic: str) -> Optional[str]:
-        """获取缓存的大纲结果"""
+    def _generate_key(self, abstracts_hash: bytes, research_topic: str) -> Tuple[bytes, str]:
+        """生成缓存键：摘要哈希与主题直接组成元组，无需再哈希一次"""
+        return abstracts_hash, research_topic
+    
+    def _hash_abstracts(self, abstracts: List[str]) -> bytes:
+        """生成摘要列表的哈希值（逐条更新哈希，不拼接整个摘要列表），只作字典键，返回原始字节"""
+        hasher = hashlib.sha256()
+        for abstract in sorted(abstracts):
+            hasher.update(abstract.encode('utf-8'))
+            hasher.update(b'|')
+        return hasher.digest()
+    
+    def get(self, abstracts: List[str], research_topic: str,
+            abstracts_hash: Optional[bytes] = None) -> Optional[str]:
+        """获取缓存的大纲结果；abstracts_hash为已算好的摘要哈希，传入时不再重复计算"""
         if not self.config.enable_caching:
             return None
             
-        abstracts_hash = self._hash_abstracts(abstracts)
+        abstracts_hash = abstracts_hash or self._hash_abstracts(abstracts)
         key = self._generate_key(abstracts_hash, research_topic)
         
         with self.lock:
-            if key in self.cache:
-                # 检查是否过期
-                if time.time() - self.access_times[key] < self.config.cache_ttl:
-                    self.access_times[key] = time.time()
+            entry = self.cache.get(key)
+            if entry is not None:
+                outline, inserted_at = entry
+                # 检查是否过期（从写入时起算）
+                if time.monotonic() - inserted_at < self.config.cache_ttl:
+                    self.cache.move_to_end(key)
                     self.stats['hits'] += 1
-                    return self.cache[key]
+                    return outline
                 else:
                     # 过期删除
                     del self.cache[key]
-                    del self.access_times[key]
                     self.stats['evictions'] += 1
             
             self.stats['misses'] += 1
             return None
     
-    def put(self, abstracts: List[str], research_topic: str, outline: str):
-        """存储大纲结果"""
+    def put(self, abstracts: List[str], research_topic: str, outline: str,
+            abstracts_hash: Optional[bytes] = None):
+        """存储大纲结果；abstracts_hash为已算好的摘要哈希，传入时不再重复计算"""
         if not self.config.enable_caching:
             return
             
-        abstracts_hash = self._hash_abstracts(abstracts)
+        abstracts_hash = abstracts_hash or self._hash_abstracts(abstracts)
         key = self._generate_key(abstracts_hash, research_topic)
         
         with self.lock:
             # 检查缓存大小
-            if len(self.cache) >= self.config.cache_size:
+            if key not in self.cache and len(self.cache) >= self.config.cache_size:
                 # LRU淘汰
-                oldest_key = min(self.access_times.keys(), key=self.access_times.get)
-                del self.cache[oldest_key]
-                del self.access_times[oldest_key]
+                self.cache.popitem(last=False)
                 self.stats['evictions'] += 1
             
-            self.cache[key] = outline
-            self.access_times[key] = time.time()
+            self.cache[key] = (outline, time.monotonic())
+            self.cache.move_to_end(key)
     
     def get_stats(self) -> Dict:
         """获取缓存统计"""
@@ -111,17 +158,27 @@ class OutlineCache:
         }
 
 
-@dataclass
 class OutlineSection:
-    """大纲章节"""
-    title: str
-    word_count: int
-    level: int = 1
-    subsections: List['OutlineSection'] = None
-    
-    def __post_init__(self):
-        if self.subsections is None:
-            self.subsections = []
+    """大纲章节（手动声明__slots__，dataclass的slots参数需要Python 3.10）"""
+    
+    __slots__ = ('title', 'word_count', 'level', 'subsections')
+    
+    def __init__(self, title: str, word_count: int, level: int = 1,
+                 subsections: Optional[List['OutlineSection']] = None):
+        self.title = title
+        self.word_count = word_count
+        self.level = level
+        self.subsections = subsections if subsections is not None else []
+    
+    def __repr__(self):
+        return (f"OutlineSection(title={self.title!r}, word_count={self.word_count!r}, "
+                f"level={self.level!r}, subsections={self.subsections!r})")
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return ((self.title, self.word_count, self.level, self.subsections) ==
+                (other.title, other.word_count, other.level, other.subsections))
 
 
 class ReviewOutlineGenerator:
@@ -151,7 +208,6 @@ class ReviewOutlineGenerator:
             'total_outlines_generated': 0,
             'total_generation_time': 0,
             'cache_hits': 0,
-            'parallel_batches': 0,
             'abstracts_processed': 0,
             'ai_calls': 0,
             'errors': 0,
@@ -183,7 +239,6 @@ class ReviewOutlineGenerator:
         else:
             raise RuntimeError("未找到可用的AI配置")
         
-        print(f"并行处理: {'启用' if self.generator_config.enable_parallel else '禁用'}")
         print(f"缓存系统: {'启用' if self.generator_config.enable_caching else '禁用'}")
     
     def _load_cached_model_config(self) -> Optional[Dict]:
@@ -297,28 +352,30 @@ class ReviewOutlineGenerator:
         start_time = time.time()
         
         print(f"\n开始生成大纲，文献数量: {len(literature_data)}")
-        print(f"并行处理: {'启用' if self.generator_config.enable_parallel else '禁用'}")
         
-        # 并行提取文献信息
-        abstracts, titles = self._extract_literature_info_parallel(literature_data)
+        # 提取文献信息
+        abstracts, titles = self._extract_literature_info(literature_data)
         
         if not abstracts:
             print("警告: 未找到摘要信息，将基于标题生成大纲")
             abstracts = titles
         
-        # 检查缓存
-        cached_outline = self.outline_cache.get(abstracts, research_topic)
-        if cached_outline:
-            self.performance_stats['cache_hits'] += 1
-            print("[OK] 命中缓存，直接返回大纲结果")
-            return cached_outline
+        # 检查缓存；摘要哈希只算一次，未命中时写缓存复用；未启用缓存时整段跳过
+        use_cache = self.generator_config.enable_caching
+        if use_cache:
+            abstracts_hash = self.outline_cache._hash_abstracts(abstracts)
+            cached_outline = self.outline_cache.get(abstracts, research_topic, abstracts_hash)
+            if cached_outline:
+                self.performance_stats['cache_hits'] += 1
+                print("[OK] 命中缓存，直接返回大纲结果")
+                return cached_outline
         
         # 生成大纲
         outline = self._generate_outline_with_ai_optimized(abstracts, research_topic)
         
         # 缓存结果
-        if outline:
-            self.outline_cache.put(abstracts, research_topic, outline)
+        if outline and use_cache:
+            self.outline_cache.put(abstracts, research_topic, outline, abstracts_hash)
         
         # 更新性能统计
         generation_time = time.time() - start_time
@@ -330,50 +387,30 @@ class ReviewOutlineGenerator:
         
         return outline
     
-    def _extract_literature_info_parallel(self, literature_data: List[Dict]) -> Tuple[List[str], List[str]]:
-        """并行提取文献信息"""
-        if self.generator_config.enable_parallel and len(literature_data) > self.generator_config.batch_size:
-            # 并行处理
-            return self._extract_info_parallel(literature_data)
-        else:
-            # 串行处理
-            abstracts = self._extract_abstracts_optimized(literature_data)
-            titles = self._extract_titles_optimized(literature_data)
-            return abstracts, titles
-    
-    def _extract_info_parallel(self, literature_data: List[Dict]) -> Tuple[List[str], List[str]]:
-        """并行提取摘要和标题"""
-        batch_size = self.generator_config.batch_size
-        batches = [literature_data[i:i + batch_size] for i in range(0, len(literature_data), batch_size)]
-        
-        all_abstracts = []
-        all_titles = []
-        
-        with ThreadPoolExecutor(max_workers=self.generator_config.max_workers) as executor:
-            # 提交所有批次任务
-            future_to_batch = {
-                executor.submit(self._process_literature_batch, batch): batch 
-                for batch in batches
-            }
+    def _extract_literature_info(self, literature_data: List[Dict]) -> Tuple[List[str], List[str]]:
+        """提取文献信息，一次遍历同时提取摘要和标题"""
+        # 提取只是字典取值和正则清理，纯Python的CPU计算受GIL限制，线程池并不能加速，因此串行处理
+        abstracts = []
+        titles = []
+        
+        for article in literature_data:
+            try:
+                abstract = self._pick_abstract(article)
+                if abstract:
+                    abstracts.append(abstract)
+            except Exception as e:
+                print(f"提取摘要失败: {e}")
+                self.performance_stats['errors'] += 1
             
-            # 收集结果
-            for future in as_completed(future_to_batch):
-                try:
-                    batch_abstracts, batch_titles = future.result()
-                    all_abstracts.extend(batch_abstracts)
-                    all_titles.extend(batch_titles)
-                    self.performance_stats['parallel_batches'] += 1
-                except Exception as e:
-                    print(f"处理文献批次失败: {e}")
-                    self.performance_stats['errors'] += 1
-        
-        return all_abstracts, all_titles
-    
-    def _process_literature_batch(self, batch: List[Dict]) -> Tuple[List[str], List[str]]:
-        """处理一个批次的文献"""
-        abstracts = self._extract_abstracts_optimized(batch)
-        titles = self._extract_titles_optimized(batch)
-        return abstracts, titles
+            try:
+                title = self._pick_title(article)
+                if title:
+                    titles.append(title)
+            except Exception as e:
+                print(f"提取标题失败: {e}")
+                self.performance_stats['errors'] += 1
+        
+        return self._select_best_abstracts(abstracts), titles
     
     def generate_outline_from_data(self, literature_data: List[Dict], research_topic: str) -> str:
         """兼容性方法"""
@@ -382,8 +419,13 @@ class ReviewOutlineGenerator:
     def _load_literature_json(self, json_file_path: str) -> List[Dict]:
         """加载JSON文献数据"""
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if HAS_ORJSON:
+                # orjson直接解析UTF-8字节，比标准库json快数倍
+                with open(json_file_path, 'rb') as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(json_file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
                 
             # 如果是智能文献检索系统导出的格式
             if isinstance(data, dict) and 'articles' in data:
@@ -401,28 +443,11 @@ class ReviewOutlineGenerator:
         """优化的摘要提取方法"""
         abstracts = []
         
-        # 可能的摘要字段名（按优先级排序）
-        abstract_fields = ['摘要', 'abstract', 'Abstract', 'summary', 'Summary', 'description', 'Description']
-        
         for article in literature_data:
             try:
-                abstract = ''
-                
-                # 尝试不同的摘要字段名
-                for field in abstract_fields:
-                    if field in article:
-                        field_value = article.get(field) or ''
-                        if isinstance(field_value, str) and field_value.strip():
-                            abstract = field_value.strip()
-                            if len(abstract) > 50:  # 找到有效摘要就跳出
-                                break
-                
-                # 智能筛选：只保留有实际内容的摘要
-                if abstract and len(abstract) > 50:
-                    # 清理摘要文本
-                    cleaned_abstract = self._clean_abstract_text(abstract)
-                    if cleaned_abstract:
-                        abstracts.append(cleaned_abstract)
+                abstract = self._pick_abstract(article)
+                if abstract:
+                    abstracts.append(abstract)
             except Exception as e:
                 print(f"提取摘要失败: {e}")
                 self.performance_stats['errors'] += 1
@@ -430,13 +455,32 @@ class ReviewOutlineGenerator:
         # 智能选择：限制数量并优化质量
         return self._select_best_abstracts(abstracts)
     
+    def _pick_abstract(self, article: Dict) -> str:
+        """取出单篇文献清理后的摘要，无有效摘要时返回空字符串"""
+        abstract = ''
+        
+        # 尝试不同的摘要字段名
+        for field_name in _ABSTRACT_FIELDS:
+            if field_name in article:
+                field_value = article.get(field_name) or ''
+                if isinstance(field_value, str) and field_value.strip():
+                    abstract = field_value.strip()
+                    if len(abstract) > 50:  # 找到有效摘要就跳出
+                        break
+        
+        # 智能筛选：只保留有实际内容的摘要
+        if abstract and len(abstract) > 50:
+            # 清理摘要文本
+            return self._clean_abstract_text(abstract)
+        return ''
+    
     def _clean_abstract_text(self, abstract: str) -> str:
         """清理摘要文本"""
         try:
             # 移除多余的空白字符
-            abstract = re.sub(r'\s+', ' ', abstract)
+            abstract = _WHITESPACE.sub(' ', abstract)
             # 移除特殊字符
-            abstract = re.sub(r'[^\w\s\u4e00-\u9fff.,;:!?()-]', '', abstract)
+            abstract = _strip_bad_chars(abstract)
             # 截断过长的摘要
             if len(abstract) > 2000:
                 abstract = abstract[:2000] + "..."
@@ -472,14 +516,19 @@ class ReviewOutlineGenerator:
             score += 0.2
         
         # 内容质量评分
-        # 检查是否包含关键词
-        keywords = ['study', 'research', 'analysis', 'results', 'conclusion', 'findings', 
-                   '研究', '分析', '结果', '结论', '发现']
-        keyword_count = sum(1 for keyword in keywords if keyword.lower() in abstract.lower())
+        # 检查是否包含关键词（摘要只转一次小写）；最多计3个，够数即停止查找
+        lowered = abstract.lower()
+        keyword_count = 0
+        for keyword in _SCORE_KEYWORDS:
+            if keyword in lowered:
+                keyword_count += 1
+                if keyword_count == 3:
+                    break
         score += min(keyword_count * 0.1, 0.3)
         
         # 结构评分
-        if '.' in abstract and len(abstract.split('.')) > 3:
+        # 至少3个句点（等价于split('.')后多于3段），count不产生中间列表
+        if abstract.count('.') >= 3:
             score += 0.2
         
         return score
@@ -494,26 +543,31 @@ class ReviewOutlineGenerator:
         
         for article in literature_data:
             try:
-                # 安全地获取标题，处理 None 值
-                title = article.get('title') or ''
-                if isinstance(title, str) and title.strip():
-                    # 清理标题文本
-                    cleaned_title = self._clean_title_text(title.strip())
-                    if cleaned_title:
-                        titles.append(cleaned_title)
+                title = self._pick_title(article)
+                if title:
+                    titles.append(title)
             except Exception as e:
                 print(f"提取标题失败: {e}")
                 self.performance_stats['errors'] += 1
         
         return titles
     
+    def _pick_title(self, article: Dict) -> str:
+        """取出单篇文献清理后的标题，无标题时返回空字符串"""
+        # 安全地获取标题，处理 None 值
+        title = article.get('title') or ''
+        if isinstance(title, str) and title.strip():
+            # 清理标题文本
+            return self._clean_title_text(title.strip())
+        return ''
+    
     def _clean_title_text(self, title: str) -> str:
         """清理标题文本"""
         try:
             # 移除多余的空白字符
-            title = re.sub(r'\s+', ' ', title)
+            title = _WHITESPACE.sub(' ', title)
             # 移除特殊字符
-            title = re.sub(r'[^\w\s\u4e00-\u9fff.,;:!?()-]', '', title)
+            title = _strip_bad_chars(title)
             # 截断过长的标题
             if len(title) > 300:
                 title = title[:300] + "..."
@@ -562,6 +616,8 @@ class ReviewOutlineGenerator:
                     print(f"[DEBUG] 生成的大纲长度: {len(outline)} 字符")
                     print(f"[DEBUG] 大纲前200字符: {outline[:200]}")
                     last_error = "大纲质量验证失败"
+                    # 未通过验证的响应已被适配器缓存，不删除的话重试会直接拿到同一份结果
+                    self.adapter.invalidate_cached_response(messages, self.model_id, self.model_parameters)
                     
             except Exception as e:
                 last_error = str(e)
@@ -586,20 +642,21 @@ class ReviewOutlineGenerator:
             return False
         
         # 检查是否包含必要结构
-        required_sections = ['引言', '结论', '总结']
-        has_required = any(section in outline for section in required_sections)
-        print(f"[DEBUG] 必要结构检查: {has_required}, 检查内容: {[section for section in required_sections if section in outline]}")
+        has_required = any(section in outline for section in _REQUIRED_SECTIONS)
         
         # 检查是否有层级结构
-        has_hierarchy = '##' in outline or '###' in outline or '-' in outline
-        print(f"[DEBUG] 层级结构检查: {has_hierarchy}")
+        has_hierarchy = '##' in outline or '-' in outline
         
         # 检查是否有字数建议 - 放宽要求，只需要包含"字"即可
         has_word_count = '字' in outline
-        print(f"[DEBUG] 字数建议检查: {has_word_count}")
         
-        print(f"[DEBUG] 大纲验证结果: 必要结构={has_required}, 层级结构={has_hierarchy}, 字数建议={has_word_count}")
-        print(f"[DEBUG] 大纲前500字符: {outline[:500]}")
+        # 详细检查结果只在调试日志中输出
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("必要结构检查: %s, 检查内容: %s", has_required,
+                         [section for section in _REQUIRED_SECTIONS if section in outline])
+            logger.debug("大纲验证结果: 必要结构=%s, 层级结构=%s, 字数建议=%s",
+                         has_required, has_hierarchy, has_word_count)
+            logger.debug("大纲前500字符: %s", outline[:500])
         
         return has_required and has_hierarchy and has_word_count
     
@@ -608,66 +665,32 @@ class ReviewOutlineGenerator:
         if not content:
             return content
         
-        lines = content.split('\n')
-        cleaned_lines = []
-        start_found = False
-        
-        # 定义可能的引导语模式
-        intro_patterns = [
-            '好的，作为',
-            '作为',
-            '根据您提供的',
-            '基于您提供的',
-            '我已对您提供的',
-            '我将为您',
-            '以下是',
-            '现在我为您',
-            '基于以上',
-            '根据以上'
-        ]
-        
-        for line in lines:
-            line = line.strip()
-            
-            # 如果还没找到开始位置，检查是否是引导语
-            if not start_found:
-                # 检查是否是大纲的开始标记
-                if (line.startswith('#') or 
-                    line.startswith('##') or 
-                    line.startswith('- ') or
-                    line.startswith('1.') or
-                    line.startswith('一、') or
-                    line.startswith('二、')):
-                    start_found = True
-                    cleaned_lines.append(line)
-                # 检查是否是引导语
-                elif any(pattern in line for pattern in intro_patterns):
-                    # 跳过引导语行
-                    continue
-                # 如果不是空行且不是引导语，可能是内容的一部分
-                elif line and not any(pattern in line for pattern in intro_patterns):
-                    # 检查是否包含实际内容标记
-                    if ('##' in line or '字' in line or '引言' in line or '结论' in line):
-                        start_found = True
-                        cleaned_lines.append(line)
-            else:
-                # 已经找到开始位置，保留所有后续内容
-                cleaned_lines.append(line)
-        
-        # 重新组合内容
-        cleaned_content = '\n'.join(cleaned_lines).strip()
-        
-        # 如果没有找到有效内容，返回原始内容
-        if not cleaned_content:
+        # 由正则直接定位大纲开始的行，跳过之前的引导语和空行
+        match = _OUTLINE_START.search(content)
+        if not match:
+            # 没有找到有效内容，返回原始内容
             return content
         
-        return cleaned_content
+        # 从开始行起保留所有后续内容（逐行去除首尾空白）
+        lines = content[match.start():].split('\n')
+        return '\n'.join([line.strip() for line in lines]).strip()
     
     def _build_outline_prompt_optimized(self, abstracts: List[str], research_topic: str) -> str:
         """优化的提示词构建方法"""
         
-        # 处理所有传入的摘要，不设上限
-        abstracts_text = "\n\n".join([f"摘要{i+1}: {abstract}" for i, abstract in enumerate(abstracts)])
+        # 处理所有传入的摘要，不设上限；
+        # 各片段直接收集后一次join，不为每篇摘要先生成一个f-string副本
+        parts = []
+        append = parts.append
+        for i, abstract in enumerate(abstracts, 1):
+            append("摘要")
+            append(str(i))
+            append(": ")
+            append(abstract)
+            append("\n\n")
+        if parts:
+            parts.pop()  # 最后一篇之后不加分隔
+        abstracts_text = "".join(parts)
         
         # 使用自定义提示词模板
         try:
@@ -796,7 +819,6 @@ class ReviewOutlineGenerator:
             'total_generation_time': self.performance_stats['total_generation_time'],
             'average_generation_time': self.performance_stats['total_generation_time'] / max(self.performance_stats['total_outlines_generated'], 1),
             'cache_hits': self.performance_stats['cache_hits'],
-            'parallel_batches': self.performance_stats['parallel_batches'],
             'abstracts_processed': self.performance_stats['abstracts_processed'],
             'ai_calls': self.performance_stats['ai_calls'],
             'errors': self.performance_stats['errors'],
@@ -813,7 +835,6 @@ class ReviewOutlineGenerator:
         print(f"总生成时间: {report['total_generation_time']:.2f}秒")
         print(f"平均生成时间: {report['average_generation_time']:.2f}秒/个")
         print(f"缓存命中次数: {report['cache_hits']}")
-        print(f"并行处理批次数: {report['parallel_batches']}")
         print(f"处理摘要总数: {report['abstracts_processed']}")
         print(f"AI调用次数: {report['ai_calls']}")
         print(f"错误次数: {report['errors']}")
@@ -832,7 +853,6 @@ class ReviewOutlineGenerator:
             # 清理缓存
             if hasattr(self, 'outline_cache'):
                 self.outline_cache.cache.clear()
-                self.outline_cache.access_times.clear()
             
             # 打印性能报告
             if self.performance_stats['total_outlines_generated'] > 0:
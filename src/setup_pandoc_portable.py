@@ -6,78 +6,169 @@ Pandoc便携版安装脚本 - 跨平台支持
 """
 
 import os
+import re
+import json
+import sys
+import time
+import hashlib
 import platform
 import requests
 import zipfile
 import tarfile
+from functools import lru_cache
 from pathlib import Path
 import tempfile
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.util.retry import Retry
+
+# 系统映射 - 支持Windows、macOS和Linux
+_SYSTEM_MAP = {
+    'windows': 'windows',
+    'linux': 'linux',
+    'darwin': 'macOS'  # macOS
+}
+
+# 架构映射 - 根据实际下载链接格式
+_ARCH_MAPS = {
+    # Windows使用x86_64命名
+    'windows': {
+        'x86_64': 'x86_64',
+        'amd64': 'x86_64',
+        'arm64': 'arm64',
+        'aarch64': 'arm64'
+    },
+    # Linux使用amd64/arm64命名
+    'linux': {
+        'x86_64': 'amd64',
+        'amd64': 'amd64',
+        'arm64': 'arm64',
+        'aarch64': 'arm64'
+    },
+    # macOS使用x86_64/arm64命名
+    'macOS': {
+        'x86_64': 'x86_64',
+        'amd64': 'x86_64',
+        'arm64': 'arm64',
+        'aarch64': 'arm64'
+    }
+}
+
+# 下载时每次读取的块大小，以及进度输出的最小刷新间隔（秒）
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+_PROGRESS_INTERVAL = 0.1
+
+# 可直接使用的系统Pandoc的最低主版本号
+_MIN_SYSTEM_PANDOC_MAJOR = 2
+_PANDOC_VERSION_RE = re.compile(r'pandoc(?:\.exe)?\s+(\d+)\.')
+
+# 最新版本号缓存的有效期（秒）
+_VERSION_CACHE_TTL = 24 * 3600
+
+# 未识别架构时的默认架构
+_DEFAULT_ARCH = {
+    'windows': 'x86_64',
+    'linux': 'amd64',
+    'macOS': 'x86_64'
+}
+
+@lru_cache(maxsize=None)
+def _platform_ids():
+    """读取一次platform.uname()，返回小写的(系统, 架构)"""
+    uname = platform.uname()
+    return uname.system.lower(), uname.machine.lower()
+
+@lru_cache(maxsize=None)
+def _get_session():
+    """获取共享的HTTP会话，复用到GitHub及代理的连接，并对网关错误自动退避重试"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=4,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    return session
+
+class _HashingWriter:
+    """包装文件对象，写入数据的同时更新哈希"""
+    
+    def __init__(self, fileobj, hasher):
+        self._fileobj = fileobj
+        self._hasher = hasher
+    
+    def write(self, data):
+        self._hasher.update(data)
+        return self._fileobj.write(data)
 
 def get_system_info():
     """获取系统信息"""
-    system = platform.system().lower()
-    machine = platform.machine().lower()
-    
-    # 系统映射 - 支持Windows、macOS和Linux
-    system_map = {
-        'windows': 'windows',
-        'linux': 'linux',
-        'darwin': 'macOS'  # macOS
-    }
+    system, machine = _platform_ids()
     
-    os_name = system_map.get(system)
+    os_name = _SYSTEM_MAP.get(system)
     if not os_name:
         raise RuntimeError(f"不支持的操作系统: {system}")
     
-    # 架构映射 - 根据实际下载链接格式
-    if os_name == 'windows':
-        # Windows使用x86_64命名
-        arch_map = {
-            'x86_64': 'x86_64',
-            'amd64': 'x86_64',
-            'arm64': 'arm64',
-            'aarch64': 'arm64'
-        }
-    elif os_name == 'linux':
-        # Linux使用amd64/arm64命名
-        arch_map = {
-            'x86_64': 'amd64',
-            'amd64': 'amd64', 
-            'arm64': 'arm64',
-            'aarch64': 'arm64'
-        }
-    else:  # macOS
-        # macOS使用x86_64/arm64命名
-        arch_map = {
-            'x86_64': 'x86_64',
-            'amd64': 'x86_64',
-            'arm64': 'arm64', 
-            'aarch64': 'arm64'
-        }
-    
-    arch = arch_map.get(machine)
+    arch = _ARCH_MAPS[os_name].get(machine)
     if not arch:
         # 默认架构
-        if os_name == 'linux':
-            arch = 'amd64'
-        else:  # Windows和macOS
-            arch = 'x86_64'
+        arch = _DEFAULT_ARCH[os_name]
         print(f"警告: 未识别的架构 {machine}，使用默认架构 {arch}")
     
     return os_name, arch
 
-def get_latest_pandoc_version():
-    """获取Pandoc最新版本号"""
+def get_latest_pandoc_version(cache_file=None):
+    """获取Pandoc最新版本号
+
+    指定cache_file时，结果缓存24小时；过期后携带ETag发起条件请求，未变化时GitHub返回304且不计入限流
+    """
+    cached = {}
+    if cache_file is not None:
+        try:
+            cached = json.loads(cache_file.read_text(encoding='utf-8'))
+            if time.time() - cache_file.stat().st_mtime < _VERSION_CACHE_TTL:
+                return cached['tag_name']
+        except (OSError, ValueError, KeyError, TypeError):
+            cached = {}
+    
     try:
         url = "https://api.github.com/repos/jgm/pandoc/releases/latest"
-        response = requests.get(url, timeout=10)
+        headers = {'If-None-Match': cached['etag']} if cached.get('etag') and cached.get('tag_name') else {}
+        response = _get_session().get(url, headers=headers, timeout=10)
+        if response.status_code == 304:
+            # 版本未变化，刷新缓存时间
+            os.utime(cache_file)
+            return cached['tag_name']
         response.raise_for_status()
-        data = response.json()
-        return data['tag_name']
+        tag_name = response.json()['tag_name']
+        if cache_file is not None:
+            try:
+                cache_file.write_text(json.dumps({'tag_name': tag_name, 'etag': response.headers.get('ETag')}), encoding='utf-8')
+            except OSError:
+                pass
+        return tag_name
     except Exception as e:
+        if cached.get('tag_name'):
+            print(f"获取版本信息失败，使用缓存的版本: {e}")
+            return cached['tag_name']
         print(f"获取版本信息失败，使用默认版本: {e}")
         return "3.1.8"  # 回退版本
 
+def get_release_asset_digest(version, filename):
+    """从GitHub发布信息中获取安装包的SHA-256摘要，获取不到时返回None"""
+    try:
+        url = f"https://api.github.com/repos/jgm/pandoc/releases/tags/{version}"
+        response = _get_session().get(url, timeout=10)
+        response.raise_for_status()
+        for asset in response.json().get('assets', []):
+            digest = asset.get('digest') or ''
+            if asset.get('name') == filename and digest.startswith('sha256:'):
+                return digest[len('sha256:'):]
+    except Exception as e:
+        print(f"获取安装包校验值失败，将跳过校验: {e}")
+    return None
+
 def download_pandoc(os_name, arch, version):
     """下载对应系统的Pandoc"""
     
@@ -97,6 +188,11 @@ def download_pandoc(os_name, arch, version):
     
     base_url = f"https://github.com/jgm/pandoc/releases/download/{version}/{filename}"
     
+    # 在后台查询安装包校验值，与用户选择、文件下载并行进行，隐藏一次GitHub API往返
+    executor = ThreadPoolExecutor(max_workers=1)
+    digest_future = executor.submit(get_release_asset_digest, version, filename)
+    executor.shutdown(wait=False)
+    
     print(f"准备下载 {filename}...")
     print(f"目标平台: {os_name} {arch}")
     print()
@@ -127,32 +223,67 @@ def download_pandoc(os_name, arch, version):
         """带进度条的下载函数"""
         try:
             print(f"开始{desc}，请稍候...")
-            response = requests.get(download_url, timeout=300, stream=True)
+            response = _get_session().get(download_url, timeout=300, stream=True)
             response.raise_for_status()
             
             # 获取文件大小
             total_size = int(response.headers.get('content-length', 0))
             
-            # 保存到临时文件，显示进度
+            # 流式保存到临时文件，边写边计算SHA-256，显示进度
+            hasher = hashlib.sha256()
             with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1]) as tmp_file:
                 if total_size > 0:
                     print(f"文件大小: {total_size / 1024 / 1024:.1f} MB")
+                else:
+                    # 无法获取大小时不显示百分比
+                    print("正在下载中...")
+                
+                # 已知文件大小时一次性预分配磁盘空间，减少逐块扩展文件带来的元数据更新
+                if total_size > 0 and hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(tmp_file.fileno(), 0, total_size)
+                    except OSError:
+                        pass
+                
+                # 小文件或非终端输出时无需显示进度，直接由copyfileobj完成复制
+                show_progress = total_size >= _DOWNLOAD_CHUNK_SIZE and sys.stdout.isatty()
+                if not show_progress:
+                    response.raw.decode_content = True
+                    shutil.copyfileobj(response.raw, _HashingWriter(tmp_file, hasher), _DOWNLOAD_CHUNK_SIZE)
+                else:
+                    total_mb = total_size / 1024 / 1024
                     downloaded = 0
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            tmp_file.write(chunk)
-                            downloaded += len(chunk)
-                            # 显示简单进度
+                    last_report = 0.0
+                    for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        hasher.update(chunk)
+                        tmp_file.write(chunk)
+                        downloaded += len(chunk)
+                        # 显示简单进度，每秒最多刷新10次，下载完成时总会刷新
+                        now = time.monotonic()
+                        if now - last_report >= _PROGRESS_INTERVAL or downloaded >= total_size:
+                            last_report = now
                             percent = (downloaded / total_size) * 100
-                            print(f"\r下载进度: {percent:.1f}% ({downloaded / 1024 / 1024:.1f}/{total_size / 1024 / 1024:.1f} MB)", end="")
+                            sys.stdout.write(f"\r下载进度: {percent:.1f}% ({downloaded / 1024 / 1024:.1f}/{total_mb:.1f} MB)")
+                            sys.stdout.flush()
+                # 实际写入量少于预分配大小时截掉多余部分
+                tmp_file.truncate()
+                
+                if show_progress:
                     print()  # 换行
                 else:
-                    # 如果无法获取大小，直接下载
-                    print("正在下载中...")
-                    tmp_file.write(response.content)
                     print("下载完成")
-                
-                return tmp_file.name
+            
+            # 校验文件完整性
+            expected_digest = digest_future.result()
+            actual_digest = hasher.hexdigest()
+            if expected_digest and actual_digest != expected_digest:
+                os.unlink(tmp_file.name)
+                raise RuntimeError(f"SHA-256校验失败: 期望 {expected_digest}，实际 {actual_digest}")
+            print(f"SHA-256: {actual_digest}{' (校验通过)' if expected_digest else ''}")
+            
+            return tmp_file.name
                 
         except Exception as e:
             raise e
@@ -178,15 +309,73 @@ def download_pandoc(os_name, arch, version):
         else:
             return None, None
 
-def extract_zip(zip_path, target_dir):
-    """解压ZIP文件"""
+def extract_zip(zip_path, target_dir, member_name=None):
+    """解压ZIP文件；指定member_name时只解压文件名与之相同的成员"""
     with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(target_dir)
+        if member_name is None:
+            zip_ref.extractall(target_dir)
+            return
+        for info in zip_ref.infolist():
+            if not info.is_dir() and info.filename.rsplit('/', 1)[-1] == member_name:
+                zip_ref.extract(info, target_dir)
+
+def extract_tar(tar_path, target_dir, member_name=None):
+    """解压TAR.GZ文件；指定member_name时只解压文件名与之相同的成员"""
+    # 支持解压过滤器的Python版本使用'data'过滤器，拒绝绝对路径、越界链接等不安全成员
+    extract_kwargs = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+    if member_name is None:
+        with tarfile.open(tar_path, 'r:gz') as tar_ref:
+            tar_ref.extractall(target_dir, **extract_kwargs)
+        return
+    # 以流式模式顺序读取，解压出目标成员后立即停止，不再解压其后的手册、数据文件
+    with tarfile.open(tar_path, 'r|gz') as tar_ref:
+        for member in tar_ref:
+            if member.isfile() and member.name.rsplit('/', 1)[-1] == member_name:
+                tar_ref.extract(member, target_dir, **extract_kwargs)
+                break
 
-def extract_tar(tar_path, target_dir):
-    """解压TAR.GZ文件"""
-    with tarfile.open(tar_path, 'r:gz') as tar_ref:
-        tar_ref.extractall(target_dir)
+def find_extracted_pandoc(extract_dir, version, exec_name):
+    """在解压目录中查找pandoc可执行文件，找不到时返回None"""
+    # 官方安装包的目录结构已知：pandoc-<版本>/pandoc.exe（Windows）或 pandoc-<版本>/bin/pandoc
+    if exec_name == "pandoc.exe":
+        expected = Path(extract_dir) / f"pandoc-{version}" / exec_name
+    else:
+        expected = Path(extract_dir) / f"pandoc-{version}" / "bin" / exec_name
+    if expected.is_file():
+        return expected
+    
+    # 目录结构不同（如macOS包带架构后缀）时再递归查找
+    return next((path for path in Path(extract_dir).rglob(exec_name) if path.is_file()), None)
+
+def find_system_pandoc(exec_name, cache_file):
+    """查找系统已安装且版本满足要求的pandoc，找不到时返回None
+
+    找到的路径写入cache_file，之后运行时只要该文件仍存在就直接使用，不再调用pandoc --version
+    """
+    try:
+        cached = cache_file.read_text(encoding='utf-8').strip()
+        if cached and os.path.isfile(cached):
+            return cached
+    except OSError:
+        pass
+    
+    system_pandoc = shutil.which(exec_name)
+    if not system_pandoc:
+        return None
+    try:
+        result = subprocess.run([system_pandoc, '--version'],
+                                capture_output=True, text=True, timeout=5)
+    except Exception:
+        return None
+    match = _PANDOC_VERSION_RE.match(result.stdout) if result.returncode == 0 else None
+    if not match or int(match.group(1)) < _MIN_SYSTEM_PANDOC_MAJOR:
+        return None
+    
+    try:
+        cache_file.write_text(system_pandoc, encoding='utf-8')
+    except OSError:
+        pass
+    return system_pandoc
 
 def setup_pandoc_portable():
     """设置便携版Pandoc"""
@@ -210,8 +399,14 @@ def setup_pandoc_portable():
         print("如需重新安装，请先删除tools/pandoc目录")
         return str(pandoc_exec)
     
+    # 系统中已有可用的pandoc时无需下载
+    system_pandoc = find_system_pandoc(exec_name, target_dir.parent / ".pandoc_path")
+    if system_pandoc:
+        print(f"检测到系统已安装Pandoc: {system_pandoc}，跳过下载")
+        return system_pandoc
+    
     # 获取最新版本
-    version = get_latest_pandoc_version()
+    version = get_latest_pandoc_version(target_dir.parent / ".version_cache.json")
     print(f"Pandoc版本: {version}")
     
     # 下载文件
@@ -223,36 +418,25 @@ def setup_pandoc_portable():
     try:
         print("解压文件...")
         
-        # 解压到临时目录
-        with tempfile.TemporaryDirectory() as temp_extract_dir:
-            extract_func(temp_file, temp_extract_dir)
+        # 解压到目标目录下的临时目录，与目标文件位于同一文件系统，之后只需重命名
+        with tempfile.TemporaryDirectory(dir=target_dir) as temp_extract_dir:
+            # 只解压pandoc可执行文件，跳过手册、数据文件等
+            extract_func(temp_file, temp_extract_dir, exec_name)
             
             # 查找pandoc可执行文件
-            pandoc_found = False
-            for root, dirs, files in os.walk(temp_extract_dir):
-                for file in files:
-                    if file == exec_name:
-                        src_path = Path(root) / file
-                        dest_path = target_dir / file
-                        
-                        # 复制可执行文件
-                        import shutil
-                        shutil.copy2(src_path, dest_path)
-                        
-                        # 设置执行权限（Linux/macOS）
-                        if os_name != 'windows':
-                            dest_path.chmod(0o755)
-                        
-                        print(f"Pandoc便携版安装完成: {dest_path}")
-                        pandoc_found = True
-                        break
-                
-                if pandoc_found:
-                    break
-            
-            if not pandoc_found:
+            src_path = find_extracted_pandoc(temp_extract_dir, version, exec_name)
+            if src_path is None:
                 print("解压文件中未找到pandoc可执行文件")
                 return None
+            
+            # 重命名到目标位置，不复制文件内容
+            os.replace(src_path, pandoc_exec)
+            
+            # 设置执行权限（Linux/macOS）
+            if os_name != 'windows':
+                pandoc_exec.chmod(0o755)
+            
+            print(f"Pandoc便携版安装完成: {pandoc_exec}")
         
         # 清理临时文件
         os.unlink(temp_file)